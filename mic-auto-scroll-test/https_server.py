@@ -2,16 +2,49 @@
 """
 Simple HTTPS server for local development
 Creates a self-signed certificate and serves files over HTTPS
+
+By default every connection gets its own thread with HTTP keep-alive, assets
+are loaded and gzip/brotli compressed once at startup, and responses carry
+ETag/Last-Modified so reloads are answered with 304s. Pass --legacy for the
+original single-threaded SimpleHTTPRequestHandler server.
 """
+import argparse
+import email.utils
+import gzip
 import http.server
+import mimetypes
 import ssl
 import os
+import posixpath
 import subprocess
 import sys
 import socket
+import threading
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
 
 PORT = 8000
 
+# Files bigger than this are streamed from disk with sendfile instead of
+# being kept in memory.
+SENDFILE_THRESHOLD = 256 * 1024
+# Variants smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+)
+# Never serve the TLS material sitting next to the assets.
+PRIVATE_SUFFIXES = (".key", ".pem")
+KEEP_ALIVE_TIMEOUT = 30
+
 def get_local_ip():
     """Get the local IP address"""
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -29,11 +62,11 @@ def create_self_signed_cert():
     """Create a self-signed certificate for HTTPS"""
     cert_file = 'server.pem'
     key_file = 'server.key'
-    
+
     # Check if cert already exists
     if os.path.exists(cert_file) and os.path.exists(key_file):
         return cert_file, key_file
-    
+
     # Create certificate using openssl
     try:
         # Generate private key and certificate in one command
@@ -55,42 +88,277 @@ def create_self_signed_cert():
         print("❌ OpenSSL not found. Please install OpenSSL.")
         sys.exit(1)
 
+class Asset:
+    """One file on disk with its validators and precompressed variants"""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+        self.variants = {}
+
+        if self.size > SENDFILE_THRESHOLD and not self.compressible:
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        if self.size <= SENDFILE_THRESHOLD:
+            self.variants['identity'] = data
+        if self.compressible and self.size >= MIN_COMPRESS_SIZE:
+            self._add_variant('gzip', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._add_variant('br', brotli.compress(data))
+
+    @property
+    def compressible(self):
+        return self.content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def etag_for(self, encoding):
+        # Each representation needs its own strong validator
+        if encoding == 'identity':
+            return self.etag
+        return self.etag[:-1] + '-' + encoding + '"'
+
+    def _add_variant(self, encoding, data):
+        if len(data) < self.size:
+            self.variants[encoding] = data
+
+    def is_stale(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return stat.st_mtime != self.mtime or stat.st_size != self.size
+
+    def pick_encoding(self, accept_encoding):
+        accepted = set()
+        for token in accept_encoding.split(','):
+            name, _, params = token.strip().partition(';')
+            if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return 'identity'
+
+
+class AssetCache:
+    """Assets keyed by absolute path, built at startup and refreshed on change"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.assets = {}
+        self.lock = threading.Lock()
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if self.is_servable(path):
+                    self.assets[path] = Asset(path)
+
+    def is_servable(self, path):
+        name = os.path.basename(path)
+        return (
+            os.path.isfile(path)
+            and not name.startswith('.')
+            and not name.endswith(PRIVATE_SUFFIXES)
+        )
+
+    def get(self, path):
+        asset = self.assets.get(path)
+        if asset is not None and not asset.is_stale():
+            return asset
+        if not self.is_servable(path):
+            return None
+        # Picks up files edited or added while the server is running
+        asset = Asset(path)
+        with self.lock:
+            self.assets[path] = asset
+        return asset
+
+    def total_bytes(self):
+        return sum(
+            len(data) for asset in self.assets.values() for data in asset.variants.values()
+        )
+
+
+class CachedRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves assets from an AssetCache with keep-alive and conditional GETs"""
+
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body are separate writes; without this, Nagle plus delayed
+    # ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    cache = None
+
+    def setup(self):
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.settimeout(self.timeout)
+            self.request.do_handshake()
+        super().setup()
+
+    def do_GET(self):
+        self.send_asset(head_only=False)
+
+    def do_HEAD(self):
+        self.send_asset(head_only=True)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def resolve(self):
+        path = urllib.parse.urlsplit(self.path).path
+        path = posixpath.normpath(urllib.parse.unquote(path))
+        parts = [
+            word for word in path.split('/')
+            if word and not os.path.dirname(word) and word not in (os.curdir, os.pardir)
+        ]
+        full_path = os.path.join(self.cache.root, *parts)
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, 'index.html')
+        return full_path
+
+    def not_modified(self, asset):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            tags = {tag[2:] if tag.startswith('W/') else tag for tag in tags}
+            if '*' in tags:
+                return True
+            return any(asset.etag_for(encoding) in tags for encoding in ('identity', 'gzip', 'br'))
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(asset.mtime) <= since
+        return False
+
+    def send_asset(self, head_only):
+        asset = self.cache.get(self.resolve())
+        if asset is None:
+            self.send_error(404, 'File not found')
+            return
+
+        encoding = asset.pick_encoding(self.headers.get('Accept-Encoding', ''))
+        if self.not_modified(asset):
+            self.send_response(304)
+            self.send_validators(asset, encoding)
+            self.end_headers()
+            return
+
+        body = asset.variants.get(encoding)
+        length = len(body) if body is not None else asset.size
+
+        self.send_response(200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(length))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_validators(asset, encoding)
+        self.end_headers()
+
+        if head_only:
+            return
+        if body is not None:
+            self.wfile.write(body)
+            return
+        # Large identity responses go straight from the page cache to the
+        # socket. Over TLS Python falls back to a plain send loop.
+        self.wfile.flush()
+        with open(asset.path, 'rb') as f:
+            self.connection.sendfile(f)
+
+    def send_validators(self, asset, encoding):
+        self.send_header('ETag', asset.etag_for(encoding))
+        self.send_header('Last-Modified', asset.last_modified)
+        # Always revalidate so edits show up on reload; unchanged files cost a 304
+        self.send_header('Cache-Control', 'no-cache')
+        if asset.compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+
+
+class ConcurrentHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    quiet = False
+
+    def handle_error(self, request, client_address):
+        # Phones rejecting the self-signed cert or dropping idle keep-alive
+        # connections are routine, not worth a traceback.
+        if isinstance(sys.exc_info()[1], (ssl.SSLError, ConnectionError, TimeoutError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def build_server(args, context):
+    server_address = ('0.0.0.0', args.port)
+
+    if args.legacy:
+        httpd = http.server.HTTPServer(server_address, http.server.SimpleHTTPRequestHandler)
+        if context is not None:
+            httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+        return httpd
+
+    cache = AssetCache(os.getcwd())
+    handler = type('Handler', (CachedRequestHandler,), {'cache': cache})
+    httpd = ConcurrentHTTPServer(server_address, handler)
+    httpd.quiet = args.quiet
+    if context is not None:
+        # Defer the TLS handshake to the connection's own thread so a slow
+        # client cannot stall accept() for everybody else.
+        httpd.socket = context.wrap_socket(
+            httpd.socket, server_side=True, do_handshake_on_connect=False
+        )
+    encodings = 'gzip, br' if brotli is not None else 'gzip (pip install brotli for br)'
+    print(f"📦 Cached {len(cache.assets)} assets ({cache.total_bytes() // 1024} KiB), encodings: {encodings}")
+    return httpd
+
 def main():
-    cert_file, key_file = create_self_signed_cert()
-    
+    parser = argparse.ArgumentParser(description='Serve this folder over HTTPS for device testing')
+    parser.add_argument('--port', type=int, default=PORT, help=f'port to listen on (default: {PORT})')
+    parser.add_argument('--legacy', action='store_true', help='use the original single-threaded server')
+    parser.add_argument('--no-tls', action='store_true', help='serve plain HTTP (enables zero-copy sendfile)')
+    parser.add_argument('--quiet', action='store_true', help='do not log every request')
+    args = parser.parse_args()
+
+    context = None
+    if not args.no_tls:
+        cert_file, key_file = create_self_signed_cert()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+
     # Create server
-    server_address = ('0.0.0.0', PORT)
-    handler = http.server.SimpleHTTPRequestHandler
-    
-    httpd = http.server.HTTPServer(server_address, handler)
-    
-    # Wrap socket with SSL
-    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-    context.load_cert_chain(cert_file, key_file)
-    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
-    
+    httpd = build_server(args, context)
+
     local_ip = get_local_ip()
-    
+    scheme = 'http' if args.no_tls else 'https'
+
     print("\n" + "="*60)
-    print("🚀 HTTPS Server Running!")
+    print(f"🚀 {scheme.upper()} Server Running!")
     print("="*60)
     print(f"\n📱 Access from your iPhone:")
-    print(f"   https://{local_ip}:{PORT}")
+    print(f"   {scheme}://{local_ip}:{args.port}")
     print(f"\n💻 Or from this computer:")
-    print(f"   https://localhost:{PORT}")
-    print(f"\n⚠️  Note: You'll see a security warning because this uses")
-    print("   a self-signed certificate. Click 'Advanced' and then")
-    print("   'Proceed to {local_ip}' to continue.")
+    print(f"   {scheme}://localhost:{args.port}")
+    if not args.no_tls:
+        print(f"\n⚠️  Note: You'll see a security warning because this uses")
+        print("   a self-signed certificate. Click 'Advanced' and then")
+        print(f"   'Proceed to {local_ip}' to continue.")
     print("\n" + "="*60)
     print("\nPress Ctrl+C to stop the server\n")
-    
+
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n\n👋 Server stopped.")
-        httpd.shutdown()
+        httpd.server_close()
 
 if __name__ == '__main__':
     main()
-
-
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tiny load generator for https_server.py
+
+Each worker thread keeps one keep-alive connection open and fetches the
+given paths in a loop, then the script reports requests/sec and latency
+percentiles. Self-signed certificates are accepted.
+
+    python load_test.py https://localhost:8000 --concurrency 32 --requests 5000
+    python load_test.py https://localhost:8000 --paths / /app.js /styles-ios.css --gzip
+"""
+import argparse
+import http.client
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def open_connection(url, timeout):
+    if url.scheme == 'https':
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return http.client.HTTPSConnection(url.hostname, url.port or 443, timeout=timeout, context=context)
+    return http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+
+
+def worker(url, paths, count, headers, revalidate, timeout, latencies, error_latencies, statuses, lock):
+    connection = open_connection(url, timeout)
+    local_latencies = []
+    local_error_latencies = []
+    local_statuses = {}
+    etags = {}
+
+    for i in range(count):
+        path = paths[i % len(paths)]
+        request_headers = dict(headers)
+        if revalidate and path in etags:
+            request_headers['If-None-Match'] = etags[path]
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=request_headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Failures and timeouts still took this long; leaving them out
+            # would flatter the percentiles.
+            local_error_latencies.append(time.perf_counter() - start)
+            connection.close()
+            connection = open_connection(url, timeout)
+            continue
+        local_latencies.append(time.perf_counter() - start)
+        local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+        etag = response.getheader('ETag')
+        if etag:
+            etags[path] = etag
+
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        error_latencies.extend(local_error_latencies)
+        for status, seen in local_statuses.items():
+            statuses[status] = statuses.get(status, 0) + seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure throughput and latency of https_server.py')
+    parser.add_argument('url', nargs='?', default='https://localhost:8000', help='server base URL')
+    parser.add_argument('--paths', nargs='+', default=['/', '/app.js', '/styles-ios.css'], help='paths to cycle through')
+    parser.add_argument('--concurrency', type=int, default=16, help='parallel keep-alive connections (default: 16)')
+    parser.add_argument('--requests', type=int, default=2000, help='total requests to send (default: 2000)')
+    parser.add_argument('--gzip', action='store_true', help='send Accept-Encoding: gzip, br')
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match after the first response (exercises 304s)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='per-request timeout in seconds')
+    args = parser.parse_args()
+
+    url = urllib.parse.urlsplit(args.url)
+    headers = {}
+    if args.gzip:
+        headers['Accept-Encoding'] = 'gzip, br'
+
+    per_worker = [args.requests // args.concurrency] * args.concurrency
+    for i in range(args.requests % args.concurrency):
+        per_worker[i] += 1
+
+    latencies, error_latencies, statuses = [], [], {}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(
+                url, args.paths, count, headers, args.revalidate, args.timeout,
+                latencies, error_latencies, statuses, lock,
+            ),
+        )
+        for count in per_worker
+        if count
+    ]
+
+    print(f"🔨 {args.requests} requests, {len(threads)} connections -> {args.url}")
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    completed = len(latencies)
+    error_count = len(error_latencies)
+    # Percentiles cover every attempt, failed and timed-out ones included.
+    attempts = sorted(latencies + error_latencies)
+    print(f"\n✅ Completed: {completed}   ❌ Errors: {error_count}   Status codes: {dict(sorted(statuses.items()))}")
+    print(f"⏱️  Elapsed:   {elapsed:.2f}s")
+    print(f"🚀 Throughput: {completed / elapsed if elapsed else 0:.1f} req/s")
+    print(f"   Latency over all {len(attempts)} attempts:")
+    for label, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99)):
+        print(f"   {label}: {percentile(attempts, fraction) * 1000:.2f} ms")
+    if attempts:
+        print(f"   max: {attempts[-1] * 1000:.2f} ms")
+    if error_latencies:
+        error_latencies.sort()
+        print(
+            f"   failed requests: p50 {percentile(error_latencies, 0.50) * 1000:.2f} ms, "
+            f"max {error_latencies[-1] * 1000:.2f} ms"
+        )
+
+    if error_count:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
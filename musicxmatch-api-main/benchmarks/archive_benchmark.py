@@ -0,0 +1,129 @@
+"""Compare the zstd-dictionary lyrics archive with one JSON file per track.
+
+Generates synthetic ``track.lyrics.get`` payloads (repeated choruses, the
+standard footer, identical JSON keys), stores them both ways and reports
+disk size and random lookup latency::
+
+    pip install zstandard
+    python benchmarks/archive_benchmark.py --tracks 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from musicxmatch_api.archive import LyricsArchive, build_archive  # noqa: E402
+
+WORDS = (
+    "amor corazón noche vida quiero tengo siempre nunca contigo sin ti "
+    "beso luna cielo camino llorar olvidar volver mañana tiempo dolor "
+    "mujer tequila vicios recuerdos alma fuego mirada boca sueño"
+).split()
+FOOTER = "\n...\n\n******* This Lyrics is NOT for Commercial use *******"
+
+
+def line(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9))).capitalize()
+
+
+def lyrics_payload(track_id, rng):
+    verses = ["\n".join(line(rng) for _ in range(4)) for _ in range(rng.randint(2, 4))]
+    chorus = "\n".join(line(rng) for _ in range(4))
+    parts = []
+    for verse in verses:
+        parts += [verse, chorus]
+    body = "\n\n".join(parts) + FOOTER
+    return {
+        "lyrics_id": 30000000 + track_id,
+        "can_edit": 0,
+        "check_validation_overridable": 0,
+        "locked": 0,
+        "published_status": 1,
+        "action_requested": "",
+        "verified": 0,
+        "restricted": 0,
+        "instrumental": 0,
+        "explicit": 0,
+        "lyrics_body": body,
+        "lyrics_language": "es",
+        "lyrics_language_description": "Spanish",
+        "script_tracking_url": f"https://tracking.musixmatch.com/t1.0/m_js/e_1/sn_0/l_{30000000 + track_id}/su_0/rs_0/tr_3vUCAF/",
+        "pixel_tracking_url": f"https://tracking.musixmatch.com/t1.0/m_img/e_1/sn_0/l_{30000000 + track_id}/su_0/rs_0/tr_3vUCAF/",
+        "html_tracking_url": f"https://tracking.musixmatch.com/t1.0/m_html/e_1/sn_0/l_{30000000 + track_id}/su_0/rs_0/tr_3vUCAF/",
+        "lyrics_copyright": "Lyrics powered by www.musixmatch.com. This Lyrics is NOT for Commercial use and only 30% of the lyrics are returned.",
+        "writer_list": [],
+        "publisher_list": [],
+        "backlink_url": f"https://www.musixmatch.com/lyrics/Artist/Song-{track_id}",
+        "updated_time": "2024-05-11T08:14:50Z",
+    }
+
+
+def timed_lookups(lookup, ids):
+    latencies = []
+    for track_id in ids:
+        start = time.perf_counter()
+        lookup(track_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--level", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    records = [(track_id, lyrics_payload(track_id, rng)) for track_id in range(100000, 100000 + args.tracks)]
+    ids = [rng.choice(records)[0] for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        json_dir = Path(workdir, "json")
+        json_dir.mkdir()
+        for track_id, payload in records:
+            (json_dir / f"{track_id}.json").write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+        archive_path = Path(workdir, "lyrics.mxla")
+        start = time.perf_counter()
+        build_archive(archive_path, records, level=args.level)
+        build_seconds = time.perf_counter() - start
+
+        def read_json(track_id):
+            with open(json_dir / f"{track_id}.json", encoding="utf-8") as fh:
+                return json.load(fh)
+
+        json_size = directory_size(json_dir)
+        archive_size = archive_path.stat().st_size
+        json_p50, json_p99 = timed_lookups(read_json, ids)
+
+        with LyricsArchive(archive_path) as archive:
+            assert archive.get(ids[0]) == read_json(ids[0])
+            archive_p50, archive_p99 = timed_lookups(archive.get, ids)
+            bytes_p50, bytes_p99 = timed_lookups(archive.get_bytes, ids)
+
+    print(f"{args.tracks} lyrics payloads, {args.lookups} random lookups (warm page cache)\n")
+    print(f"{'store':<28}{'size':>12}{'ratio':>8}{'p50 us':>10}{'p99 us':>10}")
+    print(f"{'JSON file per track':<28}{json_size / 1e6:>10.1f}MB{1.0:>8.1f}{json_p50 * 1e6:>10.1f}{json_p99 * 1e6:>10.1f}")
+    print(
+        f"{'archive, get() -> dict':<28}{archive_size / 1e6:>10.1f}MB{json_size / archive_size:>8.1f}"
+        f"{archive_p50 * 1e6:>10.1f}{archive_p99 * 1e6:>10.1f}"
+    )
+    print(f"{'archive, get_bytes()':<28}{'':>12}{'':>8}{bytes_p50 * 1e6:>10.1f}{bytes_p99 * 1e6:>10.1f}")
+    print(f"\narchive build (dictionary training + level {args.level}): {build_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
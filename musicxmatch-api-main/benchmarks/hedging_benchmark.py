@@ -0,0 +1,97 @@
+"""Measure how hedged requests cut tail latency on lyrics lookups.
+
+The local stub answers most requests in a few milliseconds but stalls a
+small fraction for a long time, like upstream requests that hang until the
+client timeout. The same workload runs with and without
+:class:`HedgedTransport` and latency percentiles are compared::
+
+    pip install requests
+    python benchmarks/hedging_benchmark.py --requests 3000 --tail-rate 0.02
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from musicxmatch_api import HedgeBudget, HedgedTransport, MusixMatchAPI, RequestsTransport  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def lyrics_url(i):
+    return f"track.lyrics.get?app_id=web-desktop-app-v1.0&format=json&track_id={i}"
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+
+    def pick(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+    return pick(0.50), pick(0.95), pick(0.99), pick(0.999)
+
+
+def run(api, total, concurrency):
+    def one(i):
+        start = time.perf_counter()
+        api.make_request(lyrics_url(i))
+        return time.perf_counter() - start
+
+    api.set_pool_size(concurrency * 2)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(total)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--fast-ms", type=float, default=10.0, help="typical stub latency")
+    parser.add_argument("--tail-ms", type=float, default=1500.0, help="latency of stalled requests")
+    parser.add_argument("--tail-rate", type=float, default=0.02, help="fraction of requests that stall")
+    parser.add_argument("--budget", type=float, default=0.05, help="max extra load from hedges")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    def latency(path):
+        if rng.random() < args.tail_rate:
+            return args.tail_ms / 1000
+        return args.fast_ms / 1000 * (0.5 + rng.random())
+
+    print(
+        f"{args.requests} lyrics lookups, concurrency {args.concurrency}, "
+        f"{args.tail_rate:.0%} of upstream requests stall for {args.tail_ms:.0f} ms\n"
+    )
+    # Stalls tie up callers, so plain runs see less load; req/s shows this.
+    header = f"{'transport':<12}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'p99.9 ms':>10}"
+    print(f"{header}{'extra load':>12}")
+    with StubServer(latency=latency) as server:
+        for name in ("plain", "hedged"):
+            transport = RequestsTransport()
+            if name == "hedged":
+                transport = HedgedTransport(transport, budget=HedgeBudget(ratio=args.budget))
+            api = MusixMatchAPI(transport=transport, secret="benchmark-secret")
+            api.base_url = server.base_url
+            server.reset_counters()
+            start = time.perf_counter()
+            latencies = run(api, args.requests, args.concurrency)
+            rate = args.requests / (time.perf_counter() - start)
+            extra = server.requests / args.requests - 1
+            p50, p95, p99, p999 = percentiles(latencies)
+            print(f"{name:<12}{rate:>8.0f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{p999:>10.1f}{extra:>11.1%}")
+            if name == "hedged":
+                stats = transport.stats
+                print(f"\nhedges sent: {stats['hedges']}, won by the hedge: {stats['hedge_wins']}")
+            # Let stalled losers finish before the next run is measured.
+            time.sleep(args.tail_ms / 1000)
+            transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Local stand-in for the Musixmatch ``ws/1.1`` API used by the benchmarks.
+
+Speaks HTTP/1.1 with keep-alive and cleartext HTTP/2 (prior knowledge) on
+the same port, answers every GET with a small Musixmatch-shaped JSON body
+after an injectable delay, and counts connections and requests so
+transports can be compared. HTTP/2 support needs ``pip install h2``.
+"""
+
+import asyncio
+import json
+import threading
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+def _body(path):
+    return json.dumps(
+        {"message": {"header": {"status_code": 200}, "body": {"path": path}}}
+    ).encode("utf-8")
+
+
+class _Protocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.buffer = b""
+        self.h2 = None
+        self.transport = None
+        self.queue = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.connections += 1
+        self.server.protocols.add(self)
+
+    def connection_lost(self, exc):
+        self.server.protocols.discard(self)
+        if self.queue is not None:
+            self.queue.put_nowait(None)
+
+    def data_received(self, data):
+        if self.h2 is not None:
+            self._h2_received(data)
+            return
+        self.buffer += data
+        if self.queue is None and len(self.buffer) >= len(H2_PREFACE) and self.buffer.startswith(H2_PREFACE):
+            self._start_h2()
+            return
+        if self.queue is None and H2_PREFACE.startswith(self.buffer):
+            return  # wait for enough bytes to tell the protocols apart
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            asyncio.ensure_future(self._h1_loop())
+        while b"\r\n\r\n" in self.buffer:
+            head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+            target = head.split(b"\r\n", 1)[0].split(b" ")[1].decode("latin-1")
+            self.queue.put_nowait(target)
+
+    async def _h1_loop(self):
+        # Responses on one HTTP/1.1 connection go out strictly in order.
+        while True:
+            target = await self.queue.get()
+            if target is None or self.transport.is_closing():
+                return
+            await self.server.delay(target)
+            body = _body(target)
+            self.server.requests += 1
+            self.transport.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + b"Content-Length: %d\r\n\r\n" % len(body)
+                + body
+            )
+
+    def _start_h2(self):
+        import h2.config
+        import h2.connection
+        import h2.settings
+
+        config = h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        self.h2 = h2.connection.H2Connection(config=config)
+        self.h2.initiate_connection()
+        self.h2.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 10000})
+        self.transport.write(self.h2.data_to_send())
+        data, self.buffer = self.buffer, b""
+        self._h2_received(data)
+
+    def _h2_received(self, data):
+        import h2.events
+
+        for event in self.h2.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                path = dict(event.headers).get(":path", "/")
+                asyncio.ensure_future(self._h2_respond(event.stream_id, path))
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.h2.data_to_send())
+
+    async def _h2_respond(self, stream_id, path):
+        await self.server.delay(path)
+        if self.transport.is_closing():
+            return
+        body = _body(path)
+        self.server.requests += 1
+        try:
+            self.h2.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(body))),
+                ],
+            )
+            self.h2.send_data(stream_id, body, end_stream=True)
+        except Exception:
+            return  # stream already reset by the client
+        self.transport.write(self.h2.data_to_send())
+
+
+class StubServer:
+    """Runs the stub on a background event loop.
+
+    ``latency`` is a callable taking the request path and returning the
+    delay in seconds, so benchmarks can inject fixed or long-tail latency.
+    """
+
+    def __init__(self, latency=lambda path: 0.0, host="127.0.0.1"):
+        self.latency = latency
+        self.host = host
+        self.port = None
+        self.connections = 0
+        self.requests = 0
+        self.protocols = set()
+        self._loop = None
+        self._thread = None
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/ws/1.1/"
+
+    async def delay(self, path):
+        seconds = self.latency(path)
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    def reset_counters(self):
+        self.connections = 0
+        self.requests = 0
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                self._loop.create_server(lambda: _Protocol(self), self.host, 0, backlog=1024)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        async def shutdown():
+            self._server.close()
+            for protocol in list(self.protocols):
+                protocol.transport.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
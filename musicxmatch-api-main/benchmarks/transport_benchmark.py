@@ -0,0 +1,91 @@
+"""Compare the requests (HTTP/1.1) and httpx (HTTP/2) transports.
+
+Fires signed requests at a local stub with a fixed per-request delay and
+reports throughput and how many TCP connections each transport opened::
+
+    pip install requests 'httpx[http2]' h2
+    python benchmarks/transport_benchmark.py --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from musicxmatch_api import HTTPXTransport, MusixMatchAPI, RequestsTransport  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def lyrics_url(i):
+    return f"track.lyrics.get?app_id=web-desktop-app-v1.0&format=json&track_id={i}"
+
+
+def make_api(server, transport):
+    api = MusixMatchAPI(transport=transport, secret="benchmark-secret")
+    api.base_url = server.base_url
+    return api
+
+
+def run_threads(api, total, concurrency):
+    api.set_pool_size(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(api.make_request, (lyrics_url(i) for i in range(total))))
+    return results
+
+
+def run_async(api, total, concurrency):
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                return await api.make_request_async(lyrics_url(i))
+
+        results = await asyncio.gather(*(one(i) for i in range(total)))
+        await api.transport.aclose()
+        return results
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub delay per request")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("requests / HTTP/1.1", "threads", RequestsTransport, run_threads),
+        ("httpx / HTTP/2", "threads", lambda: HTTPXTransport(http2_prior_knowledge=True), run_threads),
+        ("httpx / HTTP/2", "asyncio", lambda: HTTPXTransport(http2_prior_knowledge=True), run_async),
+    ]
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"stub latency {args.latency_ms:.0f} ms\n"
+    )
+    print(f"{'transport':<22}{'mode':<10}{'seconds':>9}{'req/s':>10}{'connections':>13}")
+    with StubServer(latency=lambda path: args.latency_ms / 1000) as server:
+        for name, mode, factory, runner in scenarios:
+            transport = factory()
+            api = make_api(server, transport)
+            server.reset_counters()
+            start = time.perf_counter()
+            results = runner(api, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - start
+            assert len(results) == args.requests
+            print(
+                f"{name:<22}{mode:<10}{elapsed:>9.2f}{args.requests / elapsed:>10.0f}"
+                f"{server.connections:>13}"
+            )
+            transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,11 @@ setuptools.setup(
     python_requires=">=3.6",
     extras_require={
         "dev": ["check-manifest"],
+        "http2": ["httpx[http2]"],
+        "archive": ["zstandard"],
     },
     install_requires=["requests", "beautifulsoup4"],
+    entry_points={
+        "console_scripts": ["musicxmatch-batch=musicxmatch_api.cli:main"],
+    },
 )
@@ -1,3 +1,8 @@
 __version__ = "1.0.7"
 
 from .main import *
+from .results import dedupe_tracks, fold_text, match_score, rank_tracks
+from .autocomplete import AutocompleteIndex
+from .transport import HTTPXTransport, RequestsTransport, Transport
+from .archive import LyricsArchive, LyricsArchiveWriter, build_archive, train_dictionary
+from .hedging import HedgeBudget, HedgedTransport, LatencyTracker
@@ -0,0 +1,234 @@
+"""Compressed archive of lyrics and richsync payloads with random access.
+
+Payloads such as ``get_track_lyrics(...)["message"]["body"]["lyrics"]`` are
+highly repetitive across tracks (choruses, footers, JSON keys), so each
+record is compressed on its own with a zstd dictionary trained on a sample.
+That keeps ratios close to whole-file compression while any record can be
+decompressed without touching the others. An open-addressing hash index
+maps ``track_id`` to its byte range in O(1), and readers mmap the file.
+
+Requires ``pip install zstandard``. Keep one archive per payload type
+(lyrics, richsync): a dictionary trained on one compresses the other badly.
+
+Layout (little endian)::
+
+    header   magic, version, record count, slot count, dictionary size,
+             index offset
+    dict     trained zstd dictionary (empty when the input was too small to train one)
+    records  independently compressed zstd frames
+    index    slot count x (track_id + 1, offset, length), 0 marks an empty slot
+"""
+
+import json
+import mmap
+import struct
+import threading
+from array import array
+
+MAGIC = b"MXLA"
+FORMAT_VERSION = 1
+DEFAULT_DICT_SIZE = 112640
+# Level 19 shrinks archives ~15% further but builds over 10x slower.
+DEFAULT_LEVEL = 9
+
+_HEADER = struct.Struct("<4sIQQQQ")
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "The lyrics archive needs zstandard: pip install zstandard"
+        ) from exc
+    return zstandard
+
+
+def _encode(payload) -> bytes:
+    if isinstance(payload, bytes):
+        return payload
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _slot(track_id, slot_bits) -> int:
+    # Fibonacci hashing: sequential ids still spread across the table.
+    return ((track_id * _GOLDEN) & _MASK64) >> (64 - slot_bits)
+
+
+def train_dictionary(samples, dict_size=DEFAULT_DICT_SIZE) -> bytes:
+    """Train a zstd dictionary from an iterable of payloads (dicts, str or bytes)."""
+    zstandard = _zstd()
+    return zstandard.train_dictionary(dict_size, [_encode(s) for s in samples]).as_bytes()
+
+
+class LyricsArchiveWriter:
+    """Streams records into a new archive; the index is written on :meth:`close`."""
+
+    def __init__(self, path, dictionary, level=DEFAULT_LEVEL):
+        zstandard = _zstd()
+        self._dictionary = dictionary
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * _HEADER.size)
+        self._file.write(dictionary)
+        self._offset = _HEADER.size + len(dictionary)
+        self._entries = {}
+
+    def add(self, track_id, payload):
+        track_id = int(track_id)
+        if track_id < 0:
+            raise ValueError("track_id must be a non-negative integer.")
+        frame = self._compressor.compress(_encode(payload))
+        self._file.write(frame)
+        # Re-adding a track keeps the newest payload; the old frame is dead space.
+        self._entries[track_id] = (self._offset, len(frame))
+        self._offset += len(frame)
+
+    def close(self):
+        if self._file.closed:
+            return
+        slot_bits = max(1, (2 * len(self._entries) - 1).bit_length())
+        slots = 1 << slot_bits
+        keys = array("Q", bytes(8 * slots))
+        offsets = array("Q", bytes(8 * slots))
+        lengths = array("Q", bytes(8 * slots))
+        for track_id, (offset, length) in self._entries.items():
+            slot = _slot(track_id, slot_bits)
+            while keys[slot]:
+                slot = (slot + 1) & (slots - 1)
+            keys[slot] = track_id + 1
+            offsets[slot] = offset
+            lengths[slot] = length
+
+        padding = -self._offset % 8
+        self._file.write(b"\0" * padding)
+        for section in (keys, offsets, lengths):
+            self._file.write(section.tobytes())
+        self._file.seek(0)
+        self._file.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                len(self._entries),
+                slots,
+                len(self._dictionary),
+                self._offset + padding,
+            )
+        )
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LyricsArchive:
+    """Read-only, memory-mapped view of an archive written by :class:`LyricsArchiveWriter`."""
+
+    def __init__(self, path):
+        zstandard = _zstd()
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        header = None
+        if len(self._mmap) >= _HEADER.size:
+            header = _HEADER.unpack_from(self._mmap)
+        if header is None or header[0] != MAGIC or header[1] != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError("Not a lyrics archive file.")
+        _, _, count, slots, dict_size, index_offset = header
+
+        self._count = count
+        self._slot_bits = slots.bit_length() - 1
+        self._slot_mask = slots - 1
+        self._view = view = memoryview(self._mmap)
+        self._keys = view[index_offset : index_offset + 8 * slots].cast("Q")
+        self._offsets = view[index_offset + 8 * slots : index_offset + 16 * slots].cast("Q")
+        self._lengths = view[index_offset + 16 * slots : index_offset + 24 * slots].cast("Q")
+        self._dictionary = None
+        if dict_size:
+            self._dictionary = zstandard.ZstdCompressionDict(
+                self._mmap[_HEADER.size : _HEADER.size + dict_size]
+            )
+        self._local = threading.local()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, track_id):
+        return self._locate(int(track_id)) is not None
+
+    def _locate(self, track_id):
+        key = track_id + 1
+        slot = _slot(track_id, self._slot_bits)
+        keys = self._keys
+        while True:
+            stored = keys[slot]
+            if stored == key:
+                return slot
+            if not stored:
+                return None
+            slot = (slot + 1) & self._slot_mask
+
+    def _decompressor(self):
+        # zstd decompression contexts must not be shared between threads.
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = _zstd().ZstdDecompressor(dict_data=self._dictionary)
+            self._local.decompressor = decompressor
+        return decompressor
+
+    def get_bytes(self, track_id):
+        """Return the raw payload bytes for ``track_id``, or None."""
+        slot = self._locate(int(track_id))
+        if slot is None:
+            return None
+        offset = self._offsets[slot]
+        frame = self._view[offset : offset + self._lengths[slot]]
+        return self._decompressor().decompress(frame)
+
+    def get(self, track_id):
+        """Return the payload for ``track_id`` decoded from JSON, or None."""
+        data = self.get_bytes(track_id)
+        return None if data is None else json.loads(data)
+
+    def track_ids(self):
+        return [key - 1 for key in self._keys if key]
+
+    def close(self):
+        self._keys.release()
+        self._offsets.release()
+        self._lengths.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_archive(path, records, sample_size=2000, dict_size=DEFAULT_DICT_SIZE, level=DEFAULT_LEVEL):
+    """Write ``records`` (``(track_id, payload)`` pairs) to a new archive at ``path``.
+
+    The dictionary is trained on up to ``sample_size`` evenly spaced records.
+    Inputs too small to train one are compressed without a dictionary.
+    ``records`` must be a sequence so it can be sampled and then written.
+    """
+    step = max(1, -(-len(records) // sample_size))
+    samples = [payload for _, payload in records[::step]]
+    try:
+        dictionary = train_dictionary(samples, dict_size)
+    except _zstd().ZstdError:
+        dictionary = b""
+    with LyricsArchiveWriter(path, dictionary, level) as writer:
+        for track_id, payload in records:
+            writer.add(track_id, payload)
+    return path
@@ -0,0 +1,350 @@
+import heapq
+import mmap
+import struct
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+from .results import extract_tracks, fold_text
+
+MAGIC = b"MXAC"
+FORMAT_VERSION = 2
+QUERY_WEIGHT = 3.0
+# Prefixes matching more entries than this get their top completions
+# precomputed at build time; smaller ranges are scanned on demand.
+SCAN_LIMIT = 64
+TOP_K = 16
+# Observations are merged into the arrays once this many distinct keys are
+# pending; until then :meth:`AutocompleteIndex.complete` merges them itself.
+PENDING_LIMIT = 1024
+
+_HEADER = struct.Struct("<4sIIIII")
+_NO_ENTRY = 0xFFFFFFFF
+_MAX_CHAR = "\U0010ffff"
+
+
+class _StringTable:
+    """Read-only sequence of strings backed by an offsets array and a UTF-8 blob.
+
+    Supports ``len`` and indexing, which is all :func:`bisect.bisect_left`
+    needs, so lookups decode only the handful of strings they touch.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return str(self.blob[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+
+class _Pending:
+    """Observations not yet merged into the arrays, with keys kept sorted."""
+
+    def __init__(self):
+        self.entries = {}
+        self.keys = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def observe(self, key, display, weight, display_rank):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [display, weight, display_rank]
+            insort(self.keys, key)
+        else:
+            _merge(entry, display, weight, display_rank)
+
+    def prefixed(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+        return [(key, self.entries[key]) for key in self.keys[lo:hi]]
+
+
+def _merge(entry, display, weight, display_rank):
+    """Add an observation to a ``[display, weight, display_rank]`` entry."""
+    entry[1] += weight
+    if display_rank > entry[2]:
+        entry[0], entry[2] = display, display_rank
+
+
+def _pack_strings(strings) -> tuple:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def _pad(buffer):
+    buffer += b"\0" * (-len(buffer) % 8)
+
+
+class AutocompleteIndex:
+    """Prefix completion over track names, artist names and past queries.
+
+    Observations are accumulated with :meth:`add`, :meth:`add_search_results`
+    and :meth:`record_query`; :meth:`complete` serves the highest weighted
+    completions for a prefix, ignoring case and accents. Entries live in a
+    sorted array so a prefix maps to one contiguous range, and the index can
+    be written with :meth:`save` and reopened with :meth:`load` through mmap
+    without parsing.
+
+    New observations wait in a small sorted side table that :meth:`complete`
+    merges on the fly, so feeding the index never makes the next lookup
+    rebuild it; the arrays are rebuilt every :data:`PENDING_LIMIT` keys or on
+    :meth:`build`. The index is safe to share between threads.
+    """
+
+    def __init__(self):
+        self._init_state()
+        self._attach(self._serialize({}))
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._pending = _Pending()
+        # The batch being merged by a running build(), still served meanwhile.
+        self._building = _Pending()
+        self._mmap = None
+
+    def __len__(self):
+        with self._lock:
+            unmerged = set(self._pending.entries).union(self._building.entries)
+            return len(self._keys) + sum(1 for key in unmerged if self._find(key) is None)
+
+    def add(self, text, weight=1.0):
+        self._observe(text, weight, weight)
+
+    def record_query(self, query, weight=QUERY_WEIGHT):
+        # Typed queries add popularity but never override a catalogue spelling.
+        self._observe(query, weight, 0.0)
+
+    def add_search_results(self, response, weight=1.0):
+        """Feed the track and artist names of a ``search_tracks`` response."""
+        for track in extract_tracks(response):
+            self.add(track.get("track_name"), weight)
+            self.add(track.get("artist_name"), weight)
+
+    def _observe(self, text, weight, display_rank):
+        display = " ".join((text or "").split())
+        key = fold_text(display)
+        if not key:
+            return
+        with self._lock:
+            self._pending.observe(key, display, weight, display_rank)
+            full = len(self._pending) >= PENDING_LIMIT
+        if full:
+            self._build(blocking=False)
+
+    def build(self):
+        """Merge pending observations into the searchable arrays.
+
+        Completions keep being served, pending entries included, while the
+        arrays are rebuilt.
+        """
+        self._build(blocking=True)
+
+    def _build(self, blocking):
+        if not self._build_lock.acquire(blocking=blocking):
+            return  # another thread is already merging
+        try:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch = self._building = self._pending
+                self._pending = _Pending()
+                keys, displays = self._keys, self._displays
+                weights, ranks = self._weights, self._ranks
+
+            entries = {keys[i]: [displays[i], weights[i], ranks[i]] for i in range(len(keys))}
+            for key, (display, weight, display_rank) in batch.entries.items():
+                entry = entries.get(key)
+                if entry is None:
+                    entries[key] = [display, weight, display_rank]
+                else:
+                    _merge(entry, display, weight, display_rank)
+            buffer = self._serialize(entries)
+
+            with self._lock:
+                self._attach(buffer)
+                self._building = _Pending()
+        finally:
+            self._build_lock.release()
+
+    def _find(self, key):
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+        return None
+
+    def complete(self, prefix, k=10) -> list:
+        """Return up to ``k`` ``(text, weight)`` pairs starting with ``prefix``."""
+        key = fold_text(" ".join((prefix or "").split()))
+        with self._lock:
+            best = self._complete_built(key, k)
+            displays, weights = self._displays, self._weights
+            if self._pending or self._building:
+                return self._merge_unbuilt(key, k, best)
+        return [(displays[i], weights[i]) for i in best]
+
+    def _complete_built(self, key, k) -> list:
+        """Indices of the top ``k`` built entries starting with ``key``."""
+        keys = self._keys
+        lo = bisect_left(keys, key)
+        hi = bisect_left(keys, key + _MAX_CHAR, lo)
+        if lo == hi:
+            return []
+
+        if hi - lo > SCAN_LIMIT and k <= self._top_k:
+            slot = bisect_left(self._prefixes, key)
+            if slot < len(self._prefixes) and self._prefixes[slot] == key:
+                start = slot * self._top_k
+                return [i for i in self._top[start : start + k] if i != _NO_ENTRY]
+
+        return heapq.nlargest(k, range(lo, hi), key=self._weights.__getitem__)
+
+    def _merge_unbuilt(self, key, k, best) -> list:
+        # Only entries with unmerged weight can overtake the built top k,
+        # and every one of them is in the pending ranges.
+        candidates = {
+            self._keys[i]: [self._displays[i], self._weights[i], self._ranks[i]] for i in best
+        }
+        for source in (self._building, self._pending):
+            for entry_key, (display, weight, display_rank) in source.prefixed(key):
+                entry = candidates.get(entry_key)
+                if entry is None:
+                    index = self._find(entry_key)
+                    if index is None:
+                        entry = [display, 0.0, display_rank]
+                    else:
+                        entry = [self._displays[index], self._weights[index], self._ranks[index]]
+                    candidates[entry_key] = entry
+                _merge(entry, display, weight, display_rank)
+        best = heapq.nlargest(k, candidates.values(), key=lambda entry: entry[1])
+        return [(display, weight) for display, weight, _ in best]
+
+    def save(self, path):
+        self.build()
+        with open(path, "wb") as fh:
+            fh.write(self._buffer)
+
+    @classmethod
+    def load(cls, path):
+        """Open an index written by :meth:`save`, memory-mapping its arrays."""
+        index = cls.__new__(cls)
+        index._init_state()
+        with open(path, "rb") as fh:
+            index._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        index._attach(index._mmap)
+        return index
+
+    def close(self):
+        self._keys = self._displays = self._prefixes = None
+        self._weights = self._ranks = self._top = None
+        self._buffer = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    @staticmethod
+    def _serialize(entries) -> bytes:
+        keys = sorted(entries)
+        displays = [entries[key][0] for key in keys]
+        weights = array("d", (entries[key][1] for key in keys))
+        # How authoritative each display spelling is, so later builds keep it
+        # unless a higher-ranked observation arrives.
+        ranks = array("d", (entries[key][2] for key in keys))
+
+        prefixes = []
+        top = array("I")
+
+        def visit(prefix, lo, hi):
+            if hi - lo <= SCAN_LIMIT:
+                return
+            best = heapq.nlargest(TOP_K, range(lo, hi), key=weights.__getitem__)
+            prefixes.append(prefix)
+            top.extend(best + [_NO_ENTRY] * (TOP_K - len(best)))
+            depth = len(prefix)
+            child = lo
+            while child < hi:
+                if len(keys[child]) <= depth:
+                    child += 1
+                    continue
+                child_prefix = keys[child][: depth + 1]
+                end = bisect_left(keys, child_prefix + _MAX_CHAR, child, hi)
+                visit(child_prefix, child, end)
+                child = end
+
+        visit("", 0, len(keys))
+        order = sorted(range(len(prefixes)), key=prefixes.__getitem__)
+        prefixes = [prefixes[i] for i in order]
+        top = array("I", (top[i * TOP_K + j] for i in order for j in range(TOP_K)))
+
+        key_offsets, key_blob = _pack_strings(keys)
+        display_offsets, display_blob = _pack_strings(displays)
+        prefix_offsets, prefix_blob = _pack_strings(prefixes)
+
+        buffer = bytearray(
+            _HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), len(prefixes), TOP_K, 0)
+        )
+        _pad(buffer)
+        for section in (
+            weights,
+            ranks,
+            key_offsets,
+            display_offsets,
+            prefix_offsets,
+            top,
+        ):
+            buffer += section.tobytes()
+            _pad(buffer)
+        sizes = struct.pack("<QQQ", len(key_blob), len(display_blob), len(prefix_blob))
+        buffer += sizes + key_blob + display_blob + prefix_blob
+        return bytes(buffer)
+
+    def _attach(self, buffer):
+        magic, version, count, prefix_count, top_k, _ = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not an autocomplete index file.")
+
+        view = memoryview(buffer)
+        position = _HEADER.size + (-_HEADER.size % 8)
+
+        def take(fmt, length, itemsize):
+            nonlocal position
+            section = view[position : position + length * itemsize].cast(fmt)
+            position += length * itemsize
+            position += -position % 8
+            return section
+
+        weights = take("d", count, 8)
+        ranks = take("d", count, 8)
+        key_offsets = take("I", count + 1, 4)
+        display_offsets = take("I", count + 1, 4)
+        prefix_offsets = take("I", prefix_count + 1, 4)
+        top = take("I", prefix_count * top_k, 4)
+
+        key_size, display_size, prefix_size = struct.unpack_from("<QQQ", view, position)
+        position += 24
+        key_blob = view[position : position + key_size]
+        position += key_size
+        display_blob = view[position : position + display_size]
+        position += display_size
+        prefix_blob = view[position : position + prefix_size]
+
+        self._buffer = buffer
+        self._weights = weights
+        self._ranks = ranks
+        self._top = top
+        self._top_k = top_k
+        self._keys = _StringTable(key_offsets, key_blob)
+        self._displays = _StringTable(display_offsets, display_blob)
+        self._prefixes = _StringTable(prefix_offsets, prefix_blob)
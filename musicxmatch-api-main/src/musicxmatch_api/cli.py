@@ -0,0 +1,202 @@
+"""Batch query runner.
+
+Reads one search query per line from files or stdin, runs them concurrently
+and streams one NDJSON record per query to stdout as soon as it completes,
+followed by a summary record::
+
+    python -m musicxmatch_api queries.txt --workers 16 --lyrics 3 > results.ndjson
+    cat queries.txt | musicxmatch-batch --ranked --limit 10
+
+Blank lines and lines starting with ``#`` are skipped.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .main import COMMERCIAL_PLACEHOLDER, MusixMatchAPI
+from .results import extract_tracks, rank_tracks, status_code
+
+TRACK_FIELDS = (
+    "track_id",
+    "commontrack_id",
+    "track_name",
+    "artist_name",
+    "album_name",
+    "has_lyrics",
+    "has_richsync",
+)
+
+
+def read_queries(paths):
+    """Yield queries lazily so arbitrarily large inputs are never held in memory."""
+    for path in paths or ["-"]:
+        handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in handle:
+                query = line.strip()
+                if query and not query.startswith("#"):
+                    yield query
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def collect_tracks(api, query, response, args) -> list:
+    if args.ranked:
+        tracks = rank_tracks(response, query, args.limit)
+    else:
+        tracks = extract_tracks(response)[: args.limit]
+    if not args.full:
+        tracks = [{field: track.get(field) for field in TRACK_FIELDS} for track in tracks]
+
+    for track in tracks[: args.lyrics]:
+        try:
+            lyrics = (
+                api.get_track_lyrics(track_id=track["track_id"])
+                .get("message", {})
+                .get("body", {})
+                .get("lyrics", {})
+                .get("lyrics_body")
+            )
+            track["commercial_hold"] = bool(lyrics) and COMMERCIAL_PLACEHOLDER in lyrics
+        except Exception as err:
+            track["lyrics_error"] = str(err)
+    return tracks
+
+
+def run_query(api, query, args) -> dict:
+    start = time.perf_counter()
+    record = {"type": "result", "query": query}
+    try:
+        response = api.search_tracks(query)
+        record["status_code"] = status_code(response)
+        # Upstream failures such as an expired signature (401) still come
+        # back as JSON, so only a 200 counts as a successful search.
+        if record["status_code"] == 200:
+            record["tracks"] = collect_tracks(api, query, response, args)
+        else:
+            record["error"] = f"status_code {record['status_code']}"
+    except Exception as err:
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return record
+
+
+class Summary:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies = []
+        self.queries = 0
+        self.errors = 0
+        self.lyrics_checked = 0
+        self.holds = 0
+
+    def add(self, record):
+        self.queries += 1
+        self.latencies.append(record["elapsed_ms"])
+        if "error" in record:
+            self.errors += 1
+            return
+        for track in record["tracks"]:
+            if "commercial_hold" in track:
+                self.lyrics_checked += 1
+                self.holds += track["commercial_hold"]
+
+    def as_record(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "type": "summary",
+            "queries": self.queries,
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_s": round(self.queries / elapsed, 2) if elapsed else None,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "error_rate": round(self.errors / self.queries, 4) if self.queries else None,
+            "lyrics_checked": self.lyrics_checked,
+            "hold_rate": round(self.holds / self.lyrics_checked, 4) if self.lyrics_checked else None,
+        }
+
+
+def write_record(record, out):
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def run(api, queries, args, out=sys.stdout) -> dict:
+    """Run ``queries`` with ``args.workers`` threads, streaming records to ``out``."""
+    summary = Summary()
+    # Bound the queue so reading a huge input does not submit everything at once.
+    max_pending = args.workers * 2
+
+    def drain(futures):
+        for future in futures:
+            record = future.result()
+            summary.add(record)
+            write_record(record, out)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        pending = set()
+        for query in queries:
+            pending.add(executor.submit(run_query, api, query, args))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            drain(done)
+
+    result = summary.as_record()
+    write_record(result, out)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="musicxmatch-batch",
+        description="Run many Musixmatch track searches concurrently and stream NDJSON results.",
+    )
+    parser.add_argument("inputs", nargs="*", help="query files, one query per line ('-' or none for stdin)")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent queries (default: 8)")
+    parser.add_argument("--limit", type=int, default=10, help="tracks kept per query (default: 10)")
+    parser.add_argument(
+        "--lyrics",
+        type=int,
+        default=0,
+        help="fetch lyrics for the first N tracks of each query to measure the commercial hold rate",
+    )
+    parser.add_argument("--ranked", action="store_true", help="dedupe by commontrack_id and re-rank results")
+    parser.add_argument("--full", action="store_true", help="emit complete track objects")
+    args = parser.parse_args(argv)
+
+    api = MusixMatchAPI()
+    api.set_pool_size(args.workers)
+    summary = run(api, read_queries(args.inputs), args)
+
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['queries']} queries in {summary['elapsed_s']}s "
+        f"({summary['queries_per_s']} q/s), p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+        f"errors {summary['error_rate']}, hold rate {summary['hold_rate']}",
+        file=sys.stderr,
+    )
+    # Exit non-zero only when nothing succeeded, e.g. the signature broke.
+    return 1 if summary["error_rate"] == 1 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""Local caching HTTP gateway in front of :class:`MusixMatchAPI`.
+
+A Python counterpart of ``cloudflare-hybrid-proxy`` for local development and
+on-prem deployments. Clients call ``GET /<endpoint>?...`` (or
+``/musixmatch/<endpoint>``) with the same parameters as the upstream
+``ws/1.1`` API, and the gateway signs the request server-side.
+
+* FRESH mode (default): every request goes upstream.
+* CACHED mode: users with ``use_cache`` set (column or ``metadata`` JSON,
+  see ``cloudflare-hybrid-proxy/migrations/0001_add_cache_allowlist.sql``)
+  are served from a shared in-memory cache; only status 200 responses are
+  stored.
+* Identical requests already in flight are coalesced into one upstream call.
+
+Run with ``python -m musicxmatch_api.gateway --port 8787 --db users.sqlite``.
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .main import EndPoints, MusixMatchAPI
+from .transport import HTTPXTransport
+
+ALLOWED_ENDPOINTS = frozenset(endpoint.value for endpoint in EndPoints)
+# Parameters the gateway controls itself; they never reach upstream and are
+# not part of cache keys.
+RESERVED_PARAMS = frozenset(
+    {"apikey", "user_id", "app_id", "format", "signature", "signature_protocol"}
+)
+CACHE_ALLOWLIST_TTL = 300
+# user_id comes from the client, so remembered decisions are capped.
+MAX_ALLOWLIST_DECISIONS = 10000
+MAX_HEADER_BYTES = 16 * 1024
+KEEP_ALIVE_TIMEOUT = 30
+
+_REASONS = {
+    200: "OK",
+    204: "No Content",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class CacheAllowlist:
+    """Decides which users may be served from the shared cache.
+
+    Users can be listed explicitly or looked up in a SQLite copy of the
+    ``users`` table. Lookups are remembered for ``ttl`` seconds, like the
+    worker's ``cache_allowlist:<id>`` KV entries, in an LRU of at most
+    ``max_decisions`` users.
+    """
+
+    def __init__(
+        self,
+        db_path=None,
+        user_ids=(),
+        ttl=CACHE_ALLOWLIST_TTL,
+        max_decisions=MAX_ALLOWLIST_DECISIONS,
+    ):
+        self.db_path = db_path
+        self.user_ids = set(user_ids)
+        self.ttl = ttl
+        self.max_decisions = max_decisions
+        self._decisions = OrderedDict()
+        self._connection = None
+        self._db_lock = threading.Lock()
+
+    def is_allowed(self, user_id) -> bool:
+        decision = self._known(user_id)
+        if decision is None:
+            decision = self._remember(user_id, self._lookup(user_id))
+        return decision
+
+    async def is_allowed_async(self, user_id, executor=None) -> bool:
+        """Like :meth:`is_allowed`, but runs database lookups on ``executor``."""
+        decision = self._known(user_id)
+        if decision is None:
+            loop = asyncio.get_running_loop()
+            allowed = await loop.run_in_executor(executor, self._lookup, user_id)
+            decision = self._remember(user_id, allowed)
+        return decision
+
+    def _known(self, user_id):
+        """Return the decision if it needs no database lookup, else None."""
+        if not user_id:
+            return False
+        if user_id in self.user_ids:
+            return True
+        if not self.db_path:
+            return False
+        decision = self._decisions.get(user_id)
+        if decision is not None and decision[1] > time.monotonic():
+            self._decisions.move_to_end(user_id)
+            return decision[0]
+        return None
+
+    def _remember(self, user_id, allowed) -> bool:
+        self._decisions[user_id] = (allowed, time.monotonic() + self.ttl)
+        self._decisions.move_to_end(user_id)
+        while len(self._decisions) > self.max_decisions:
+            self._decisions.popitem(last=False)
+        return allowed
+
+    def _lookup(self, user_id) -> bool:
+        try:
+            with self._db_lock:
+                if self._connection is None:
+                    self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+                row = self._connection.execute(
+                    "SELECT use_cache, metadata FROM users WHERE id = ?", (user_id,)
+                ).fetchone()
+        except sqlite3.Error:
+            # Same as the worker: a failing lookup means no cache.
+            return False
+        if row is None:
+            return False
+        use_cache, metadata = row
+        if use_cache == 1:
+            return True
+        if metadata:
+            try:
+                return json.loads(metadata).get("use_cache") in (1, True)
+            except (ValueError, AttributeError):
+                return False
+        return False
+
+
+class ResponseCache:
+    """Bounded LRU of upstream responses, optionally expiring after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=10000, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.time() - entry["timestamp"] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, body, endpoint):
+        self._entries[key] = {"body": body, "timestamp": time.time(), "endpoint": endpoint}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def cache_key(endpoint, params) -> str:
+    # Re-encode so "q=a%26z%3D1" and "q=a&z=1" cannot share an entry.
+    query = urllib.parse.urlencode(
+        sorted((key, value) for key, value in params if key not in RESERVED_PARAMS)
+    )
+    return f"musixmatch:{endpoint}:{query}"
+
+
+class Gateway:
+    """Asyncio HTTP front end sharing one signer, connection pool and cache."""
+
+    def __init__(self, api=None, allowlist=None, cache=None, workers=32):
+        self.api = api or MusixMatchAPI()
+        self.allowlist = allowlist or CacheAllowlist()
+        self.cache = cache or ResponseCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._inflight = {}
+        self.stats = {"requests": 0, "upstream": 0, "hits": 0, "coalesced": 0}
+
+        self.api.set_pool_size(workers)
+
+    async def serve(self, host="127.0.0.1", port=8787):
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_BYTES
+        )
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT
+                    )
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 431, {"error": "Headers too large"}, {}, False)
+                    return
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    return
+
+                method, target, version, headers = self._parse_head(head)
+                keep_alive = self._keep_alive(version, headers)
+                if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+                    # Only bodiless GET/OPTIONS are supported; don't try to
+                    # resynchronise with an unread body.
+                    keep_alive = False
+
+                status, body, extra = await self.dispatch(method, target)
+                await self._write(writer, status, body, extra, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target):
+        if method == "OPTIONS":
+            return 204, None, {
+                "Access-Control-Allow-Methods": "GET, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type, Authorization",
+                "Access-Control-Max-Age": "86400",
+            }
+        if method != "GET":
+            return 405, {"error": "Method not allowed", "allowed": ["GET"]}, {}
+
+        url = urllib.parse.urlsplit(target)
+        path = url.path
+        if path.startswith("/musixmatch/"):
+            path = path[len("/musixmatch/") :]
+        endpoint = path.strip("/").split("/")[0]
+        if not endpoint:
+            return 400, {"error": "Invalid endpoint", "path": url.path}, {}
+        if endpoint not in ALLOWED_ENDPOINTS:
+            return 403, {"error": "Endpoint not allowed", "allowed": sorted(ALLOWED_ENDPOINTS)}, {}
+
+        params = urllib.parse.parse_qsl(url.query, keep_blank_values=True)
+        user_id = dict(params).get("user_id")
+        self.stats["requests"] += 1
+        return await self.process(endpoint, params, user_id)
+
+    async def process(self, endpoint, params, user_id):
+        key = cache_key(endpoint, params)
+        use_cache = await self.allowlist.is_allowed_async(user_id, self.executor)
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["hits"] += 1
+                return 200, cached["body"], {
+                    "X-Cache": "HIT",
+                    "X-Cache-Timestamp": str(int(cached["timestamp"] * 1000)),
+                    "X-Cache-Endpoint": cached["endpoint"],
+                    "X-Cache-Mode": "cached",
+                }
+
+        try:
+            body = await self._fetch(key, endpoint, params)
+        except Exception as err:
+            return 500, {
+                "error": "Failed to fetch from Musixmatch API",
+                "details": str(err),
+            }, {}
+
+        if not use_cache:
+            return 200, body, {"X-Cache": "FRESH", "X-Cache-Mode": "no-cache"}
+        return 200, body, {"X-Cache": "MISS", "X-Cache-Key": key, "X-Cache-Mode": "cached"}
+
+    async def _fetch(self, key, endpoint, params):
+        """Fetch ``endpoint`` upstream, sharing the call with identical in-flight requests."""
+        while key in self._inflight:
+            future = self._inflight[key]
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only take over when the leading request was cancelled, not this one.
+                if not future.cancelled():
+                    raise
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            query = urllib.parse.urlencode(
+                [(k, v) for k, v in params if k not in RESERVED_PARAMS]
+            )
+            url = f"{endpoint}?app_id=web-desktop-app-v1.0&format=json"
+            if query:
+                url += "&" + query
+            self.stats["upstream"] += 1
+            if self.api.transport.supports_async:
+                data = await self.api.make_request_async(url)
+            else:
+                data = await loop.run_in_executor(self.executor, self.api.make_request, url)
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            status = (data or {}).get("message", {}).get("header", {}).get("status_code")
+            if status == 200:
+                self.cache.set(key, body, endpoint)
+            future.set_result(body)
+            return body
+        except Exception as err:
+            future.set_exception(err)
+            # Mark the exception retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            # The leading request was cancelled: release the coalesced waiters.
+            if not future.done():
+                future.cancel()
+
+    @staticmethod
+    def _parse_head(head):
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    @staticmethod
+    def _keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @staticmethod
+    async def _write(writer, status, body, extra, keep_alive):
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        body = body or b""
+        headers = {
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            "Access-Control-Allow-Origin": "*",
+        }
+        if status != 204:
+            headers["Content-Type"] = "application/json"
+        headers.update(extra)
+        head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching gateway for the Musixmatch API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--db", help="SQLite database with the users table (use_cache allowlist)")
+    parser.add_argument(
+        "--cache-user",
+        action="append",
+        default=[],
+        help="user id allowed to use the cache (repeatable)",
+    )
+    parser.add_argument("--cache-size", type=int, default=10000, help="max cached responses")
+    parser.add_argument("--cache-ttl", type=float, help="seconds before a cached response expires")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent upstream requests")
+    parser.add_argument("--http2", action="store_true", help="multiplex upstream calls over HTTP/2 (needs httpx[http2])")
+    args = parser.parse_args()
+
+    gateway = Gateway(
+        api=MusixMatchAPI(transport=HTTPXTransport() if args.http2 else None),
+        allowlist=CacheAllowlist(db_path=args.db, user_ids=args.cache_user),
+        cache=ResponseCache(max_entries=args.cache_size, ttl=args.cache_ttl),
+        workers=args.workers,
+    )
+    print(f"Musixmatch gateway listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(gateway.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Hedged requests: cut tail latency by duplicating requests that run late.
+
+:class:`HedgedTransport` wraps another transport. When a request has not
+answered within the rolling p95 latency of its endpoint, an identical signed
+request is sent, optionally through a second transport (e.g. another
+proxy). A token budget keeps the duplicates to a small fraction of
+traffic::
+
+    api = MusixMatchAPI(transport=HedgedTransport(RequestsTransport()))
+"""
+
+import asyncio
+import threading
+import time
+import urllib.parse
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .transport import Transport
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latency window used to pick the hedge delay."""
+
+    def __init__(
+        self,
+        percentile=0.95,
+        window=500,
+        min_samples=100,
+        initial_delay=1.0,
+        min_delay=0.01,
+        max_delay=5.0,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+
+    def delay(self, endpoint) -> float:
+        with self._lock:
+            samples = sorted(self._samples[endpoint])
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        value = samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+        return min(self.max_delay, max(self.min_delay, value))
+
+
+class HedgeBudget:
+    """Token bucket: every request earns ``ratio`` tokens and a hedge costs one.
+
+    With ``ratio=0.05`` hedges never exceed ~5% extra load; ``burst`` caps
+    how many unused tokens can pile up during quiet periods.
+    """
+
+    def __init__(self, ratio=0.05, burst=10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def available(self) -> bool:
+        return self._tokens >= 1.0
+
+    def spend(self):
+        with self._lock:
+            self._tokens -= 1.0
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+def _endpoint(url) -> str:
+    return urllib.parse.urlsplit(url).path.rsplit("/", 1)[-1]
+
+
+class HedgedTransport(Transport):
+    """Sends a duplicate of any request that outlives its endpoint's p95.
+
+    Sync calls hand the primary to a worker thread so the caller can return
+    whichever answer arrives first; ``max_workers`` should cover the number
+    of calling threads, as threads beyond it queue. The duplicate goes out
+    from a small dedicated pool of ``hedge_workers`` threads and is skipped
+    when all of them are busy. Async calls race both tasks on the event
+    loop. Either way the loser finishes in the background and is dropped.
+    """
+
+    supports_async = True
+
+    def __init__(
+        self, primary, secondary=None, tracker=None, budget=None, max_workers=256, hedge_workers=8
+    ):
+        self.primary = primary
+        self.secondary = secondary or primary
+        self.tracker = tracker or LatencyTracker()
+        self.budget = budget or HedgeBudget()
+        self.stats = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+        self._stats_lock = threading.Lock()
+        self._losers = set()
+        # Both pools start threads on demand, so idle ones cost nothing.
+        self._primaries = ThreadPoolExecutor(max_workers, thread_name_prefix="hedge-primary")
+        self._hedges = ThreadPoolExecutor(hedge_workers, thread_name_prefix="hedge")
+        self._hedge_slots = threading.BoundedSemaphore(hedge_workers)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get(self, url, headers=None, timeout=5) -> dict:
+        endpoint = _endpoint(url)
+        self._count("requests")
+        self.budget.earn()
+        delay = self.tracker.delay(endpoint)
+        start = time.perf_counter()
+        if delay >= timeout or not self.budget.available():
+            # No hedge can be sent, so skip the thread hand-off.
+            result = self.primary.get(url, headers, timeout)
+            self.tracker.record(endpoint, time.perf_counter() - start)
+            return result
+
+        primary = self._primaries.submit(self.primary.get, url, headers, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._try_reserve_hedge():
+            result = primary.result()
+        else:
+            result = self._race(primary, url, headers, timeout)
+        # Latency is measured from the primary's start so hedged requests
+        # count in full and the percentile is not biased low.
+        self.tracker.record(endpoint, time.perf_counter() - start)
+        return result
+
+    def _race(self, primary, url, headers, timeout):
+        self._count("hedges")
+        hedge = self._hedges.submit(self.secondary.get, url, headers, timeout)
+        hedge.add_done_callback(lambda _: self._hedge_slots.release())
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                return future.result()
+        raise error
+
+    def _try_reserve_hedge(self) -> bool:
+        if not self._hedge_slots.acquire(blocking=False):
+            return False
+        if self.budget.try_spend():
+            return True
+        self._hedge_slots.release()
+        return False
+
+    async def get_async(self, url, headers=None, timeout=5) -> dict:
+        endpoint = _endpoint(url)
+        self._count("requests")
+        self.budget.earn()
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(self.primary.get_async(url, headers, timeout))
+        hedge = None
+        pending = {primary}
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.tracker.delay(endpoint))
+            if not done and self.budget.try_spend():
+                self._count("hedges")
+                hedge = asyncio.ensure_future(self.secondary.get_async(url, headers, timeout))
+                pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self.tracker.record(endpoint, time.perf_counter() - start)
+                    if task is hedge:
+                        self._count("hedge_wins")
+                    return task.result()
+            raise error
+        finally:
+            # Cancelling mid-write can desync a shared HTTP/2 connection's
+            # header compression, so requests still running when the race
+            # is won, or the caller is cancelled, finish and are dropped.
+            for task in pending:
+                self._losers.add(task)
+                task.add_done_callback(self._discard)
+
+    def _discard(self, task):
+        self._losers.discard(task)
+        if not task.cancelled():
+            task.exception()  # mark a losing request's error as retrieved
+
+    def set_pool_size(self, maxsize):
+        self.primary.set_pool_size(maxsize)
+        if self.secondary is not self.primary:
+            self.secondary.set_pool_size(maxsize)
+
+    def close(self):
+        self._primaries.shutdown(wait=False)
+        self._hedges.shutdown(wait=False)
+        self.primary.close()
+        if self.secondary is not self.primary:
+            self.secondary.close()
+
+    async def aclose(self):
+        self._primaries.shutdown(wait=False)
+        self._hedges.shutdown(wait=False)
+        await self.primary.aclose()
+        if self.secondary is not self.primary:
+            await self.secondary.aclose()
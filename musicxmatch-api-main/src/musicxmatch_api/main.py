@@ -12,8 +12,12 @@ from functools import cache
 
 import requests
 
+from .results import rank_tracks, status_code
+from .transport import RequestsTransport
+
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36"
 SIGNATURE_KEY_BASE_URL = "https://s.mxmcdn.net/site/js/"
+COMMERCIAL_PLACEHOLDER = "******* This Lyrics is NOT for Commercial use *******"
 
 
 class EndPoints(Enum):
@@ -32,11 +36,19 @@ class EndPoints(Enum):
 
 
 class MusixMatchAPI:
-    def __init__(self, proxies=None):
+    def __init__(self, proxies=None, autocomplete=None, transport=None, secret=None):
         self.base_url = "https://www.musixmatch.com/ws/1.1/"
         self.headers = {"User-Agent": USER_AGENT}
         self.proxies = proxies
-        self.secret = self.get_secret()
+        # Carries every signed request; see transport.py for the HTTP/2 option.
+        self.transport = transport or RequestsTransport(proxies=proxies)
+        # Optional AutocompleteIndex fed with every committed search.
+        self.autocomplete = autocomplete
+        self.secret = secret or self.get_secret()
+
+    def set_pool_size(self, maxsize):
+        """Allow up to ``maxsize`` concurrent keep-alive connections per host."""
+        self.transport.set_pool_size(maxsize)
 
     @cache
     def get_latest_app(self):
@@ -109,7 +121,16 @@ class MusixMatchAPI:
 
     def search_tracks(self, track_query, page=1) -> dict:
         url = f"{EndPoints.SEARCH_TRACK.value}?app_id=web-desktop-app-v1.0&format=json&q={urllib.parse.quote(track_query)}&f_has_lyrics=true&page_size=100&page={page}"
-        return self.make_request(url)
+        result = self.make_request(url)
+        if self.autocomplete is not None and status_code(result) == 200:
+            self.autocomplete.record_query(track_query)
+            self.autocomplete.add_search_results(result)
+        return result
+
+    def search_tracks_ranked(self, track_query, page=1, limit=None) -> list:
+        """Search tracks, collapse duplicates by ``commontrack_id`` and re-rank
+        them against ``track_query``. Returns a list of track dicts."""
+        return rank_tracks(self.search_tracks(track_query, page=page), track_query, limit)
 
     def get_track(self, track_id=None, track_isrc=None) -> dict:
         if not (track_id or track_isrc):
@@ -196,14 +217,21 @@ class MusixMatchAPI:
 
         return self.make_request(base_url)
 
-    def make_request(self, url) -> dict:
+    def sign_url(self, url) -> str:
         url = url.replace("%20", "+").replace(" ", "+")
         url = self.base_url + url
-        signed_url = url + self.generate_signature(url)
-        response = requests.get(
-            signed_url, headers=self.headers, proxies=self.proxies, timeout=5
+        return url + self.generate_signature(url)
+
+    def make_request(self, url) -> dict:
+        return self.transport.get(self.sign_url(url), headers=self.headers, timeout=5)
+
+    async def make_request_async(self, url) -> dict:
+        """Async variant of :meth:`make_request` taking the same relative URL,
+        e.g. ``"track.lyrics.get?app_id=web-desktop-app-v1.0&format=json&track_id=1"``.
+        """
+        return await self.transport.get_async(
+            self.sign_url(url), headers=self.headers, timeout=5
         )
-        return response.json()
 
 
 if __name__ == "__main__":
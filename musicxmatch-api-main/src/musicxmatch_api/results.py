@@ -0,0 +1,148 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+@lru_cache(maxsize=65536)
+def fold_text(text) -> str:
+    """Lowercase ``text`` and strip accents so "Canción" matches "cancion"."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.casefold()
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text) -> tuple:
+    return tuple(_TOKEN_PATTERN.findall(fold_text(text)))
+
+
+def status_code(response):
+    """Return ``message.header.status_code`` of a raw API response, if any."""
+    if not isinstance(response, dict):
+        return None
+    return response.get("message", {}).get("header", {}).get("status_code")
+
+
+def extract_tracks(response) -> list:
+    """Return the plain track dicts from a ``search_tracks`` response.
+
+    Accepts either the raw response, a ``track_list`` or a list of track dicts.
+    """
+    if isinstance(response, dict):
+        body = response.get("message", {}).get("body")
+        # Error responses carry an empty string body instead of a dict.
+        response = body.get("track_list", []) if isinstance(body, dict) else []
+    tracks = []
+    for item in response or []:
+        track = item.get("track", item) if isinstance(item, dict) else None
+        if track:
+            tracks.append(track)
+    return tracks
+
+
+def track_quality(track) -> tuple:
+    """Sort key for picking the best entry of a commontrack group."""
+    return (
+        track.get("has_lyrics") == 1,
+        track.get("has_richsync") == 1,
+        track.get("has_subtitles") == 1,
+        track.get("track_rating") or 0,
+        track.get("num_favourite") or 0,
+    )
+
+
+def dedupe_tracks(tracks) -> list:
+    """Collapse tracks sharing a ``commontrack_id`` into their best entry.
+
+    The surviving entry keeps the position of the first member of its group,
+    so upstream ordering is preserved for everything that is not a duplicate.
+    """
+    best = {}
+    order = []
+    for track in tracks:
+        key = track.get("commontrack_id") or ("track", track.get("track_id"))
+        current = best.get(key)
+        if current is None:
+            order.append(key)
+            best[key] = track
+        elif track_quality(track) > track_quality(current):
+            best[key] = track
+    return [best[key] for key in order]
+
+
+def _token_score(query_token, candidates) -> float:
+    best = 0.0
+    for candidate in candidates:
+        if candidate == query_token:
+            return 1.0
+        if candidate.startswith(query_token) or query_token.startswith(candidate):
+            score = 0.85 if len(query_token) >= 2 else 0.5
+        else:
+            # Only pay for the full ratio when the cheap upper bound can win.
+            floor = max(0.75, best / 0.8)
+            matcher = SequenceMatcher(None, query_token, candidate)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+            score = matcher.ratio()
+            if score < 0.75:
+                continue
+            score *= 0.8
+        if score > best:
+            best = score
+    return best
+
+
+def match_score(track, query) -> float:
+    """Score how well ``track`` matches ``query``, accent and case insensitive.
+
+    Title matches weigh more than artist matches; an exact or contiguous
+    title match gets an extra bonus. The result is in the range 0..2.
+    """
+    query_tokens = tokenize(query)
+    if not query_tokens:
+        return 0.0
+
+    name = track.get("track_name") or ""
+    artist = track.get("artist_name") or ""
+    name_tokens = tokenize(name)
+    artist_tokens = tokenize(artist)
+
+    total = 0.0
+    for token in query_tokens:
+        in_name = _token_score(token, name_tokens)
+        in_artist = _token_score(token, artist_tokens) * 0.7
+        total += max(in_name, in_artist)
+    score = total / len(query_tokens)
+
+    folded_query = " ".join(query_tokens)
+    folded_name = " ".join(name_tokens)
+    if folded_name == folded_query:
+        score += 1.0
+    elif folded_query in folded_name:
+        score += 0.5
+    elif folded_query in folded_name + " " + " ".join(artist_tokens):
+        score += 0.25
+
+    if score and track.get("has_lyrics") != 1:
+        score *= 0.5
+    return score
+
+
+def rank_tracks(tracks, query, limit=None) -> list:
+    """Dedupe ``tracks`` by ``commontrack_id`` and re-rank them against ``query``.
+
+    Ties keep the order upstream returned them in.
+    """
+    unique = dedupe_tracks(extract_tracks(tracks))
+    scored = [
+        (match_score(track, query), track_quality(track), -index, track)
+        for index, track in enumerate(unique)
+    ]
+    scored.sort(key=lambda entry: entry[:3], reverse=True)
+    ranked = [entry[3] for entry in scored]
+    return ranked if limit is None else ranked[:limit]
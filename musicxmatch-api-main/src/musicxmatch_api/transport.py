@@ -0,0 +1,173 @@
+"""HTTP transports used by :meth:`MusixMatchAPI.make_request`.
+
+Every call goes to the single ``www.musixmatch.com`` host, so the transport
+decides how concurrency maps onto connections:
+
+* :class:`RequestsTransport` (default) pools HTTP/1.1 connections with
+  ``requests``; N concurrent calls need N sockets.
+* :class:`HTTPXTransport` speaks HTTP/2 through ``httpx[http2]`` and
+  multiplexes concurrent calls over one connection. Sync calls are handed
+  to a background event loop, so its async client is the only owner of the
+  connection's stream state.
+"""
+
+import abc
+import asyncio
+import threading
+import weakref
+
+import requests
+
+
+class Transport(abc.ABC):
+    """Minimal interface: fetch a signed URL and return the decoded JSON."""
+
+    #: True when :meth:`get_async` runs natively on the event loop.
+    supports_async = False
+
+    @abc.abstractmethod
+    def get(self, url, headers=None, timeout=5) -> dict:
+        """Fetch ``url`` and return the decoded JSON body."""
+
+    async def get_async(self, url, headers=None, timeout=5) -> dict:
+        return await asyncio.to_thread(self.get, url, headers, timeout)
+
+    def set_pool_size(self, maxsize):
+        pass
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    def __init__(self, proxies=None):
+        self.proxies = proxies
+        self.session = requests.Session()
+
+    def get(self, url, headers=None, timeout=5) -> dict:
+        response = self.session.get(
+            url, headers=headers, proxies=self.proxies, timeout=timeout
+        )
+        return response.json()
+
+    def set_pool_size(self, maxsize):
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """HTTP/2 transport; requires ``pip install httpx[http2]``.
+
+    ``http2_prior_knowledge`` skips ALPN negotiation and talks HTTP/2 over
+    cleartext, which is only useful against local test servers.
+    """
+
+    supports_async = True
+
+    def __init__(self, proxies=None, max_connections=None, http2_prior_knowledge=False):
+        try:
+            import httpx
+        except ImportError as exc:
+            raise ImportError(
+                "HTTPXTransport needs httpx with HTTP/2 support: pip install 'httpx[http2]'"
+            ) from exc
+
+        self._httpx = httpx
+        proxy = None
+        if proxies:
+            proxy = proxies.get("https") or proxies.get("all") or proxies.get("http")
+        self._options = {
+            "http1": not http2_prior_knowledge,
+            "http2": True,
+            "proxy": proxy,
+            # One connection carries many streams, so only a handful are needed.
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=4),
+        }
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=5) -> dict:
+        # httpcore's sync HTTP/2 connection is not thread-safe, so threads
+        # share the async client of one background loop instead.
+        future = asyncio.run_coroutine_threadsafe(
+            self.get_async(url, headers, timeout), self._background_loop()
+        )
+        return future.result()
+
+    async def get_async(self, url, headers=None, timeout=5) -> dict:
+        response = await self._async_client().get(url, headers=headers, timeout=timeout)
+        return response.json()
+
+    def _async_client(self):
+        # An AsyncClient is bound to the loop it first runs on.
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._httpx.AsyncClient(**self._options)
+            self._async_clients[loop] = client
+        return client
+
+    def _background_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="httpx-transport", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def _stop_background_loop(self):
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def _detach_async_clients(self):
+        clients = list(self._async_clients.items())
+        self._async_clients = weakref.WeakKeyDictionary()
+        return clients
+
+    def close(self):
+        """Close every client on its own event loop and stop the sync loop.
+
+        Clients whose loop is already closed cannot be awaited any more; use
+        :meth:`aclose` before leaving the loop to release them cleanly.
+        """
+        background = self._loop
+        for loop, client in self._detach_async_clients():
+            if loop.is_closed():
+                continue
+            if loop is background:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+        self._stop_background_loop()
+
+    async def aclose(self):
+        """Close every client, awaiting those that belong to running loops."""
+        current = asyncio.get_running_loop()
+        closing = []
+        for loop, client in self._detach_async_clients():
+            if loop is current:
+                closing.append(client.aclose())
+            elif loop.is_running():
+                closing.append(
+                    asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+                )
+        await asyncio.gather(*closing)
+        self._stop_background_loop()
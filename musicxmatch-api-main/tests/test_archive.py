@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+zstandard = pytest.importorskip("zstandard")
+
+from musicxmatch_api import archive  # noqa: E402
+from musicxmatch_api.archive import LyricsArchive, LyricsArchiveWriter, build_archive  # noqa: E402
+
+
+def lyrics(track_id):
+    chorus = "Let the sky fall, when it crumbles\nWe will stand tall, face it all together\n"
+    return {
+        "lyrics_id": track_id * 7,
+        "lyrics_body": f"Verse {track_id}\n" + chorus * (1 + track_id % 3),
+        "lyrics_copyright": "Lyrics powered by www.musixmatch.com.",
+    }
+
+
+def records(count, start=0):
+    return [(track_id, lyrics(track_id)) for track_id in range(start, start + count)]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "lyrics.mxla"
+    data = records(500)
+    build_archive(path, data, sample_size=100)
+
+    with LyricsArchive(path) as reader:
+        assert reader._dictionary is not None
+        assert len(reader) == len(data)
+        assert sorted(reader.track_ids()) == [track_id for track_id, _ in data]
+        for track_id, payload in data:
+            assert track_id in reader
+            assert reader.get(track_id) == payload
+            assert json.loads(reader.get_bytes(track_id)) == payload
+
+
+def test_missing_ids_return_none(tmp_path):
+    path = tmp_path / "lyrics.mxla"
+    build_archive(path, records(200, start=1000), sample_size=50)
+
+    with LyricsArchive(path) as reader:
+        for track_id in [0, 1, 999, 1200, 2**40, 2**63]:
+            assert track_id not in reader
+            assert reader.get(track_id) is None
+            assert reader.get_bytes(track_id) is None
+
+
+def colliding_ids(count, slot_bits):
+    """Track ids that all hash to the same slot of a table with ``slot_bits``."""
+    target = archive._slot(1, slot_bits)
+    ids = []
+    candidate = 1
+    while len(ids) < count:
+        if archive._slot(candidate, slot_bits) == target:
+            ids.append(candidate)
+        candidate += 1
+    return ids
+
+
+def test_colliding_ids_probe_linearly(tmp_path):
+    count = 12
+    slot_bits = (2 * count - 1).bit_length()
+    ids = colliding_ids(count + 4, slot_bits)
+    stored, absent = ids[:count], ids[count:]
+
+    path = tmp_path / "lyrics.mxla"
+    with LyricsArchiveWriter(path, dictionary=b"") as writer:
+        for track_id in stored:
+            writer.add(track_id, f"lyrics for {track_id}")
+
+    with LyricsArchive(path) as reader:
+        assert reader._slot_bits == slot_bits
+        for track_id in stored:
+            assert reader.get_bytes(track_id) == f"lyrics for {track_id}".encode()
+        for track_id in absent:
+            assert reader.get_bytes(track_id) is None
+
+
+def test_small_input_falls_back_to_no_dictionary(tmp_path):
+    path = tmp_path / "lyrics.mxla"
+    data = records(5)
+    build_archive(path, data)
+
+    with LyricsArchive(path) as reader:
+        assert reader._dictionary is None
+        assert [reader.get(track_id) for track_id, _ in data] == [payload for _, payload in data]
+
+
+def test_empty_archive(tmp_path):
+    path = tmp_path / "lyrics.mxla"
+    build_archive(path, [])
+    with LyricsArchive(path) as reader:
+        assert len(reader) == 0
+        assert reader.get(1) is None
+
+
+def test_sample_size_is_an_upper_bound(tmp_path, monkeypatch):
+    seen = []
+
+    def train(samples, dict_size):
+        seen.append(len(samples))
+        return b""
+
+    monkeypatch.setattr(archive, "train_dictionary", train)
+    build_archive(tmp_path / "lyrics.mxla", records(199), sample_size=100)
+    assert seen == [100]
+
+
+def test_writer_keeps_the_newest_payload_and_closes_once(tmp_path):
+    path = tmp_path / "lyrics.mxla"
+    with LyricsArchiveWriter(path, dictionary=b"") as writer:
+        writer.add(0, {"lyrics_body": "old"})
+        writer.add(0, b'{"lyrics_body": "new"}')
+        writer.add(1, "plain text")
+        writer.close()
+
+    with LyricsArchive(path) as reader:
+        assert len(reader) == 2
+        assert reader.get(0) == {"lyrics_body": "new"}
+        assert reader.get_bytes(1) == b"plain text"
+
+
+def test_negative_track_ids_are_rejected(tmp_path):
+    with LyricsArchiveWriter(tmp_path / "lyrics.mxla", dictionary=b"") as writer:
+        with pytest.raises(ValueError):
+            writer.add(-1, "lyrics")
+
+
+@pytest.mark.parametrize("content", [b"XXXX" + b"\0" * 60, b"MXLA"])
+def test_rejects_other_files(tmp_path, content):
+    path = tmp_path / "not-an-archive"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        LyricsArchive(path)
@@ -0,0 +1,206 @@
+import random
+import string
+import threading
+from bisect import bisect_left
+
+import pytest
+
+from musicxmatch_api import MusixMatchAPI, Transport, autocomplete
+from musicxmatch_api.autocomplete import SCAN_LIMIT, TOP_K, AutocompleteIndex
+
+
+def random_words(rng, count):
+    # A small alphabet makes short prefixes cover far more than SCAN_LIMIT keys.
+    return ["".join(rng.choices("abcde", k=rng.randint(1, 6))) for _ in range(count)]
+
+
+def observe(index, expected, rng, words):
+    for word in words:
+        weight = rng.random()
+        index.add(word, weight)
+        expected[word] = expected.get(word, 0.0) + weight
+
+
+def brute_force(expected, prefix, k):
+    matches = [(text, weight) for text, weight in expected.items() if text.startswith(prefix)]
+    return sorted(matches, key=lambda item: -item[1])[:k]
+
+
+def all_prefixes(expected):
+    prefixes = {""}
+    for text in expected:
+        prefixes.update(text[:i] for i in range(1, len(text) + 1))
+    return sorted(prefixes) + ["zz"]
+
+
+def assert_matches(index, expected, prefix, k):
+    got = index.complete(prefix, k)
+    want = brute_force(expected, prefix, k)
+    assert [text for text, _ in got] == [text for text, _ in want], (prefix, k)
+    assert [weight for _, weight in got] == pytest.approx([weight for _, weight in want])
+
+
+@pytest.fixture
+def populated():
+    rng = random.Random(7)
+    index = AutocompleteIndex()
+    expected = {}
+    observe(index, expected, rng, random_words(rng, 3000))
+    index.build()
+    return index, expected, rng
+
+
+def test_complete_matches_brute_force(populated):
+    index, expected, _ = populated
+    for prefix in all_prefixes(expected):
+        for k in (1, 5, TOP_K, TOP_K + 4):
+            assert_matches(index, expected, prefix, k)
+
+
+def test_precomputed_top_k_matches_brute_force(populated):
+    index, expected, _ = populated
+    prefixes = [
+        prefix
+        for prefix in all_prefixes(expected)
+        if sum(text.startswith(prefix) for text in expected) > SCAN_LIMIT
+    ]
+    assert prefixes, "fixture should exercise the precomputed table"
+    for prefix in prefixes:
+        slot = bisect_left(index._prefixes, prefix)
+        assert index._prefixes[slot] == prefix
+        assert_matches(index, expected, prefix, TOP_K)
+
+
+def test_pending_observations_are_served_without_rebuilding(populated):
+    index, expected, rng = populated
+    observe(index, expected, rng, random_words(rng, 200) + ["zebra", "ab"])
+    buffer = index._buffer
+    for prefix in all_prefixes(expected):
+        assert_matches(index, expected, prefix, 10)
+    assert index._buffer is buffer
+    assert len(index) == len(expected)
+
+    index.build()
+    assert index._buffer is not buffer
+    for prefix in all_prefixes(expected):
+        assert_matches(index, expected, prefix, 10)
+
+
+def test_pending_limit_triggers_a_batch_build(monkeypatch):
+    monkeypatch.setattr(autocomplete, "PENDING_LIMIT", 10)
+    index = AutocompleteIndex()
+    for i in range(25):
+        index.add(f"track {i}")
+    assert len(index._pending) < 10
+    assert len(index) == 25
+
+
+def test_record_query_never_overrides_catalogue_spelling():
+    index = AutocompleteIndex()
+    index.add("Beyoncé")
+    index.record_query("beyonce")
+    assert index.complete("BEYON") == [("Beyoncé", 1.0 + autocomplete.QUERY_WEIGHT)]
+    index.build()
+    index.record_query("BEYONCE")
+    assert index.complete("bey") == [("Beyoncé", 1.0 + 2 * autocomplete.QUERY_WEIGHT)]
+
+
+def test_catalogue_spelling_replaces_a_built_query_spelling(tmp_path):
+    index = AutocompleteIndex()
+    index.record_query("dos vicios")
+    index.build()
+    index.add("Dos Vicios")
+    assert index.complete("dos") == [("Dos Vicios", 1.0 + autocomplete.QUERY_WEIGHT)]
+    index.build()
+    assert index.complete("dos") == [("Dos Vicios", 1.0 + autocomplete.QUERY_WEIGHT)]
+
+    path = tmp_path / "autocomplete.idx"
+    index.save(path)
+    loaded = AutocompleteIndex.load(path)
+    try:
+        loaded.record_query("DOS VICIOS")
+        loaded.build()
+        assert loaded.complete("dos") == [("Dos Vicios", 1.0 + 2 * autocomplete.QUERY_WEIGHT)]
+    finally:
+        loaded.close()
+
+
+class CannedTransport(Transport):
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, headers=None, timeout=5) -> dict:
+        return self.response
+
+
+def test_search_tracks_only_feeds_successful_responses():
+    index = AutocompleteIndex()
+    error = {"message": {"header": {"status_code": 401, "hint": "renew"}, "body": ""}}
+    api = MusixMatchAPI(autocomplete=index, transport=CannedTransport(error), secret="x")
+    assert api.search_tracks("dos vicios") == error
+    assert len(index) == 0
+
+    track = {"track": {"track_name": "Dos Vicios", "artist_name": "Selena Gomez"}}
+    api.transport = CannedTransport(
+        {"message": {"header": {"status_code": 200}, "body": {"track_list": [track]}}}
+    )
+    api.search_tracks("dos vicios")
+    assert [text for text, _ in index.complete("dos")] == ["Dos Vicios"]
+
+
+def test_save_load_round_trip(populated, tmp_path):
+    index, expected, rng = populated
+    observe(index, expected, rng, ["unsaved"])
+    path = tmp_path / "autocomplete.idx"
+    index.save(path)
+
+    loaded = AutocompleteIndex.load(path)
+    try:
+        assert path.read_bytes()[:4] == autocomplete.MAGIC
+        assert len(loaded) == len(expected)
+        for prefix in all_prefixes(expected):
+            assert loaded.complete(prefix, TOP_K) == index.complete(prefix, TOP_K)
+
+        observe(loaded, expected, rng, ["after load"])
+        assert_matches(loaded, expected, "after", 10)
+        loaded.build()
+        assert_matches(loaded, expected, "", TOP_K)
+    finally:
+        loaded.close()
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-index"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        AutocompleteIndex.load(path)
+
+
+def test_empty_index():
+    index = AutocompleteIndex()
+    assert len(index) == 0
+    assert index.complete("a") == []
+    index.add("   ")
+    assert len(index) == 0
+    assert index.complete("", 3) == []
+
+
+def test_concurrent_feeding_and_lookups(monkeypatch):
+    monkeypatch.setattr(autocomplete, "PENDING_LIMIT", 50)
+    index = AutocompleteIndex()
+    words = [f"{letter}{i}" for letter in string.ascii_lowercase[:4] for i in range(300)]
+
+    def feed(chunk):
+        for word in chunk:
+            index.add(word)
+            index.complete(word[:1], 5)
+
+    threads = [threading.Thread(target=feed, args=(words[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(index) == len(words)
+    index.build()
+    assert len(index.complete("", 2000)) == len(words)
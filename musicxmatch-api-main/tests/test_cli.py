@@ -0,0 +1,78 @@
+import io
+import json
+import threading
+from types import SimpleNamespace
+
+from musicxmatch_api.cli import run
+from musicxmatch_api.main import COMMERCIAL_PLACEHOLDER
+
+
+def ok(*names):
+    tracks = [{"track": {"track_id": i, "track_name": name}} for i, name in enumerate(names)]
+    return {"message": {"header": {"status_code": 200}, "body": {"track_list": tracks}}}
+
+
+class FakeAPI:
+    def __init__(self):
+        self.released = threading.Event()
+        self.slow_saw_streaming = None
+
+    def search_tracks(self, query):
+        if query == "slow":
+            # Only finishes once a result record has been written out.
+            self.slow_saw_streaming = self.released.wait(2)
+            return ok("Slow Song")
+        if query == "expired":
+            return {"message": {"header": {"status_code": 401, "hint": "renew"}, "body": ""}}
+        if query == "missing":
+            return {"message": {"header": {"status_code": 404}, "body": {}}}
+        if query == "broken":
+            raise ConnectionError("reset")
+        return ok("Skyfall", "Skyfall (Live)")
+
+    def get_track_lyrics(self, track_id):
+        body = COMMERCIAL_PLACEHOLDER if track_id == 0 else "We will stand tall"
+        return {"message": {"body": {"lyrics": {"lyrics_body": body}}}}
+
+
+class StreamOut(io.StringIO):
+    def __init__(self, api):
+        super().__init__()
+        self.api = api
+
+    def write(self, text):
+        if json.loads(text)["type"] == "result":
+            self.api.released.set()
+        return super().write(text)
+
+
+def args(**overrides):
+    defaults = {"workers": 4, "limit": 10, "lyrics": 2, "ranked": False, "full": False}
+    return SimpleNamespace(**{**defaults, **overrides})
+
+
+def test_results_stream_before_the_summary_and_counts_add_up():
+    api = FakeAPI()
+    out = StreamOut(api)
+    queries = ["slow", "skyfall", "expired", "missing", "broken"]
+    summary = run(api, iter(queries), args(), out=out)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert api.slow_saw_streaming is True
+    assert [record["type"] for record in records] == ["result"] * 5 + ["summary"]
+    assert records[-1] == summary
+
+    by_query = {record["query"]: record for record in records[:-1]}
+    assert by_query["expired"]["status_code"] == 401 and "error" in by_query["expired"]
+    assert by_query["missing"]["status_code"] == 404 and "error" in by_query["missing"]
+    assert by_query["broken"]["error"] == "ConnectionError: reset"
+    assert [track["track_name"] for track in by_query["skyfall"]["tracks"]] == [
+        "Skyfall",
+        "Skyfall (Live)",
+    ]
+
+    assert summary["queries"] == 5
+    assert summary["error_rate"] == 0.6
+    # skyfall checks two tracks, slow checks one; track_id 0 is held twice.
+    assert summary["lyrics_checked"] == 3
+    assert summary["hold_rate"] == round(2 / 3, 4)
@@ -0,0 +1,76 @@
+import asyncio
+import sqlite3
+import urllib.parse
+from types import SimpleNamespace
+
+from musicxmatch_api.gateway import CacheAllowlist, Gateway, cache_key
+
+
+class FakeAPI:
+    def __init__(self, delay=0.05):
+        self.transport = SimpleNamespace(supports_async=True)
+        self.delay = delay
+        self.urls = []
+
+    def set_pool_size(self, maxsize):
+        pass
+
+    async def make_request_async(self, url):
+        self.urls.append(url)
+        await asyncio.sleep(self.delay)
+        return {"message": {"header": {"status_code": 200}, "body": {"url": url}}}
+
+
+def parse(query):
+    return urllib.parse.parse_qsl(query, keep_blank_values=True)
+
+
+def test_cache_key_escapes_values():
+    one_search = cache_key("track.search", parse("q=a%26z%3D1"))
+    two_params = cache_key("track.search", parse("q=a&z=1"))
+    assert one_search != two_params
+
+
+def test_cache_key_ignores_order_and_reserved_params():
+    assert cache_key("track.search", parse("q=adele&page=2&user_id=1")) == cache_key(
+        "track.search", parse("page=2&q=adele&user_id=2&signature=x")
+    )
+
+
+def test_coalesced_requests_survive_a_cancelled_leader():
+    async def scenario():
+        api = FakeAPI()
+        gateway = Gateway(api=api)
+        params = parse("q=skyfall")
+        key = cache_key("track.search", params)
+
+        leader = asyncio.create_task(gateway._fetch(key, "track.search", params))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(gateway._fetch(key, "track.search", params))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        body = await asyncio.wait_for(follower, 1)
+        assert b"skyfall" in body
+        assert len(api.urls) == 2
+        assert key not in gateway._inflight
+
+    asyncio.run(scenario())
+
+
+def test_allowlist_reads_sqlite_off_the_loop_and_stays_bounded(tmp_path):
+    path = tmp_path / "users.sqlite"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE users (id TEXT, use_cache INTEGER, metadata TEXT)")
+        connection.execute("INSERT INTO users VALUES ('1', 1, NULL)")
+        connection.execute("INSERT INTO users VALUES ('2', 0, '{\"use_cache\": true}')")
+        connection.execute("INSERT INTO users VALUES ('3', 0, NULL)")
+
+    allowlist = CacheAllowlist(db_path=str(path), max_decisions=2)
+
+    async def scenario():
+        return [await allowlist.is_allowed_async(user_id) for user_id in ("1", "2", "3", "4")]
+
+    assert asyncio.run(scenario()) == [True, True, False, False]
+    assert list(allowlist._decisions) == ["3", "4"]
+    assert allowlist.is_allowed("1") is True
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from musicxmatch_api import HedgeBudget, HedgedTransport, LatencyTracker, Transport
+
+URL = "https://example.test/ws/1.1/track.lyrics.get?track_id=1"
+
+
+class FakeTransport(Transport):
+    supports_async = True
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.finished = 0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            self.calls += 1
+
+    def _finish(self):
+        with self._lock:
+            self.finished += 1
+        if self.error is not None:
+            raise self.error
+        return {"from": self.name}
+
+    def get(self, url, headers=None, timeout=5) -> dict:
+        self._start()
+        time.sleep(self.delay)
+        return self._finish()
+
+    async def get_async(self, url, headers=None, timeout=5) -> dict:
+        self._start()
+        await asyncio.sleep(self.delay)
+        return self._finish()
+
+
+def hedged(primary, secondary, delay, budget=None):
+    return HedgedTransport(
+        primary, secondary, tracker=LatencyTracker(initial_delay=delay), budget=budget
+    )
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    primary, secondary = FakeTransport("primary", delay=1.0), FakeTransport("secondary")
+    transport = hedged(primary, secondary, delay=0.02)
+    try:
+        start = time.perf_counter()
+        assert transport.get(URL) == {"from": "secondary"}
+        assert time.perf_counter() - start < 0.5
+        assert transport.stats == {"requests": 1, "hedges": 1, "hedge_wins": 1}
+        assert primary.calls == 1 and primary.finished == 0
+    finally:
+        transport.close()
+
+
+def test_fast_primary_still_wins_the_race():
+    primary, secondary = FakeTransport("primary", delay=0.05), FakeTransport("secondary", delay=1.0)
+    transport = hedged(primary, secondary, delay=0.01)
+    try:
+        assert transport.get(URL) == {"from": "primary"}
+        assert transport.stats == {"requests": 1, "hedges": 1, "hedge_wins": 0}
+    finally:
+        transport.close()
+
+
+def test_async_slow_primary_is_hedged():
+    primary, secondary = FakeTransport("primary", delay=1.0), FakeTransport("secondary")
+    transport = hedged(primary, secondary, delay=0.02)
+
+    async def scenario():
+        result = await transport.get_async(URL)
+        assert transport._losers
+        return result
+
+    assert asyncio.run(scenario()) == {"from": "secondary"}
+    assert transport.stats == {"requests": 1, "hedges": 1, "hedge_wins": 1}
+
+
+def test_failure_before_the_delay_is_raised_not_hedged():
+    primary = FakeTransport("primary", error=ConnectionError("refused"))
+    secondary = FakeTransport("secondary")
+    transport = hedged(primary, secondary, delay=0.5)
+    try:
+        with pytest.raises(ConnectionError):
+            transport.get(URL)
+        with pytest.raises(ConnectionError):
+            asyncio.run(transport.get_async(URL))
+        assert secondary.calls == 0
+        assert transport.stats["hedges"] == 0
+    finally:
+        transport.close()
+
+
+def test_empty_budget_sends_no_hedge():
+    primary, secondary = FakeTransport("primary", delay=0.1), FakeTransport("secondary")
+    transport = hedged(primary, secondary, delay=0.01, budget=HedgeBudget(ratio=0.0, burst=0.0))
+    try:
+        assert transport.get(URL) == {"from": "primary"}
+        assert asyncio.run(transport.get_async(URL)) == {"from": "primary"}
+        assert secondary.calls == 0
+        assert transport.stats == {"requests": 2, "hedges": 0, "hedge_wins": 0}
+    finally:
+        transport.close()
+
+
+def test_cancelled_caller_leaves_the_primary_to_finish():
+    primary, secondary = FakeTransport("primary", delay=0.1), FakeTransport("secondary")
+    transport = hedged(primary, secondary, delay=1.0)
+
+    async def scenario():
+        caller = asyncio.create_task(transport.get_async(URL))
+        await asyncio.sleep(0.02)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        assert len(transport._losers) == 1
+        await asyncio.sleep(0.2)
+        assert not transport._losers
+
+    asyncio.run(scenario())
+    assert primary.finished == 1
+    assert secondary.calls == 0
+
+
+def test_tracker_uses_initial_delay_below_min_samples():
+    tracker = LatencyTracker(min_samples=10, initial_delay=0.7, min_delay=0.01, max_delay=5.0)
+    for _ in range(9):
+        tracker.record("track.get", 0.1)
+    assert tracker.delay("track.get") == 0.7
+    tracker.record("track.get", 0.1)
+    assert tracker.delay("track.get") == pytest.approx(0.1)
+    assert tracker.delay("track.search") == 0.7
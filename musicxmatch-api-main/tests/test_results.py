@@ -0,0 +1,63 @@
+from musicxmatch_api import dedupe_tracks, match_score, rank_tracks
+
+
+def track(track_id, name, artist="Adele", commontrack_id=None, **extra):
+    return {
+        "track_id": track_id,
+        "commontrack_id": commontrack_id,
+        "track_name": name,
+        "artist_name": artist,
+        "has_lyrics": 1,
+        **extra,
+    }
+
+
+def response(*tracks):
+    return {
+        "message": {
+            "header": {"status_code": 200},
+            "body": {"track_list": [{"track": t} for t in tracks]},
+        }
+    }
+
+
+def test_duplicates_collapse_to_the_entry_with_lyrics_and_richsync():
+    plain = track(1, "Skyfall", commontrack_id=10, has_lyrics=0)
+    lyrics = track(2, "Skyfall", commontrack_id=10)
+    richsync = track(3, "Skyfall", commontrack_id=10, has_richsync=1)
+    assert dedupe_tracks([plain, lyrics, richsync]) == [richsync]
+
+
+def test_dedupe_keeps_the_first_seen_position():
+    first = track(1, "Hello", commontrack_id=20, has_lyrics=0)
+    other = track(2, "Skyfall", commontrack_id=10)
+    better = track(3, "Hello", commontrack_id=20, has_richsync=1)
+    loose = track(4, "Rolling in the Deep")
+    assert dedupe_tracks([first, other, better, loose]) == [better, other, loose]
+
+
+def test_match_score_ignores_accents_and_case():
+    song = track(1, "Canción")
+    assert match_score(song, "cancion") == match_score(song, "CANCIÓN") > 1.5
+    assert match_score(song, "cancion") > match_score(track(2, "Cancun"), "cancion")
+
+
+def test_rank_tracks_orders_by_score_and_keeps_ties_stable():
+    tie_a = track(1, "Skyfall", commontrack_id=1)
+    other = track(2, "Set Fire to the Rain", commontrack_id=2)
+    tie_b = track(3, "Skyfall", commontrack_id=3)
+    ranked = rank_tracks(response(other, tie_a, tie_b), "skyfall")
+    assert ranked == [tie_a, tie_b, other]
+
+
+def test_rank_tracks_limit():
+    tracks = response(*(track(i, f"Song {i}", commontrack_id=i) for i in range(5)))
+    assert len(rank_tracks(tracks, "song")) == 5
+    assert len(rank_tracks(tracks, "song", limit=2)) == 2
+    assert rank_tracks(tracks, "song", limit=0) == []
+
+
+def test_rank_tracks_handles_error_responses():
+    error = {"message": {"header": {"status_code": 401, "hint": "renew"}, "body": ""}}
+    assert rank_tracks(error, "skyfall") == []
+    assert rank_tracks({"message": {"header": {"status_code": 404}, "body": {}}}, "x") == []
@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+from musicxmatch_api import HTTPXTransport, MusixMatchAPI  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    with StubServer(latency=lambda path: 0.005) as server:
+        yield server
+
+
+def test_concurrent_sync_calls_share_one_http2_connection(server):
+    transport = HTTPXTransport(http2_prior_knowledge=True)
+    urls = [f"{server.base_url}track.get?track_id={i}" for i in range(400)]
+    try:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            bodies = list(pool.map(transport.get, urls))
+    finally:
+        transport.close()
+
+    for i, body in enumerate(bodies):
+        assert body["message"]["body"]["path"].endswith(f"track.get?track_id={i}")
+    assert server.requests == len(urls)
+    assert server.connections == 1
+    assert transport._loop is None
+
+
+def test_each_loop_gets_its_own_async_client(server):
+    transport = HTTPXTransport(http2_prior_knowledge=True)
+    url = f"{server.base_url}track.get?track_id=1"
+
+    async def fetch_twice():
+        await transport.get_async(url)
+        client = transport._async_client()
+        await transport.get_async(url)
+        assert transport._async_client() is client
+        return client
+
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        clients = [loop.run_until_complete(fetch_twice()) for loop in (first, second)]
+        assert clients[0] is not clients[1]
+        assert set(transport._async_clients) == {first, second}
+        transport.close()
+        assert all(client.is_closed for client in clients)
+        assert len(transport._async_clients) == 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_close_from_inside_a_running_loop(server):
+    transport = HTTPXTransport(http2_prior_knowledge=True)
+    url = f"{server.base_url}track.get?track_id=1"
+
+    async def scenario():
+        transport.get(url)  # starts the background loop for sync calls
+        await transport.get_async(url)
+        client = transport._async_client()
+        transport.close()
+        assert transport._loop is None
+        # The running loop's client is closed once the loop gets to it.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert client.is_closed
+
+    asyncio.run(scenario())
+
+
+def test_readme_aclose_example(server):
+    api = MusixMatchAPI(transport=HTTPXTransport(http2_prior_knowledge=True), secret="x")
+    api.base_url = server.base_url
+    transport = api.transport
+    lyrics = api.get_track_lyrics(track_id=103149239)
+    assert lyrics["message"]["header"]["status_code"] == 200
+    urls = [f"track.get?app_id=web-desktop-app-v1.0&format=json&track_id={i}" for i in range(20)]
+
+    async def main():
+        try:
+            return await asyncio.gather(*(api.make_request_async(url) for url in urls))
+        finally:
+            clients = list(transport._async_clients.values())
+            await api.transport.aclose()
+            assert len(clients) == 2 and all(client.is_closed for client in clients)
+
+    tracks = asyncio.run(main())
+    assert len(tracks) == len(urls)
+    assert len(transport._async_clients) == 0
+    assert transport._loop is None
+    assert server.connections == 2
@@ -9,14 +9,15 @@ Then run:
     python troubleshoot-search/test_mm_commercial_gui.py
 
 Type a search and click "Search". Select any result to fetch lyrics and see
-whether Musixmatch returned the commercial-use placeholder.
+whether Musixmatch returned the commercial-use placeholder. Lyrics for the
+first visible rows are prefetched in the background, so selecting them is
+instant.
 """
 
 from __future__ import annotations
 
-import queue
-import threading
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import ttk
 
 
@@ -40,6 +41,10 @@ except ImportError as exc:  # pragma: no cover - setup guard
 
 
 COMMERCIAL_PLACEHOLDER = "******* This Lyrics is NOT for Commercial use *******"
+MAX_WORKERS = 4
+PREFETCH_WORKERS = 2
+# Matches the results tree height, i.e. the rows visible without scrolling.
+PREFETCH_ROWS = 12
 
 
 class CommercialCheckApp(tk.Tk):
@@ -53,7 +58,21 @@ class CommercialCheckApp(tk.Tk):
         self.results: list[dict] = []
         self.lyrics_cache: dict[int, dict] = {}
 
+        # Searches and clicked lyrics run on their own pool so they never queue
+        # behind background prefetches. Each request kind carries a generation
+        # number; responses from an older generation are dropped instead of
+        # overwriting newer ones.
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="mxm")
+        self.prefetch_executor = ThreadPoolExecutor(
+            max_workers=PREFETCH_WORKERS, thread_name_prefix="mxm-prefetch"
+        )
+        self.search_generation = 0
+        self.selection_generation = 0
+        self.lyrics_inflight: dict[int, Future] = {}
+        self.prefetch_futures: list[Future] = []
+
         self._build_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def _build_widgets(self) -> None:
         top_frame = ttk.Frame(self, padding=12)
@@ -132,48 +151,58 @@ class CommercialCheckApp(tk.Tk):
         self.lyrics_text.insert("1.0", "Searching…")
         self.lyrics_text.configure(state=tk.DISABLED)
         self.results = []
-        self.lyrics_cache.clear()
-
-        work_queue: queue.Queue[tuple[str, dict]] = queue.Queue()
-
-        def worker() -> None:
-            try:
-                params = {
-                    "track_query": query,
-                    "page": 1,
-                }
-                raw = self.api.search_tracks(track_query=query, page=1)
-                track_list = raw.get("message", {}).get("body", {}).get("track_list", [])
-                results = []
-                for item in track_list:
-                    track = item.get("track", {})
-                    if not track:
-                        continue
-                    if not self.include_instrumental_var.get() and track.get("has_lyrics") != 1:
-                        continue
-                    results.append(track)
-                    if len(results) >= self.page_size_var.get():
-                        break
-                work_queue.put(("done", {"results": results}))
-            except Exception as err:  # pragma: no cover - UI flow
-                work_queue.put(("error", {"message": str(err)}))
-
-        threading.Thread(target=worker, daemon=True).start()
-        self.after(100, self._poll_queue, work_queue)
-
-    def _poll_queue(self, work_queue: queue.Queue) -> None:
+
+        self.search_generation += 1
+        generation = self.search_generation
+        # Lyrics still loading for the old results must not replace "Searching…".
+        self.selection_generation += 1
+        # Queued prefetches for the previous results are no longer useful.
+        for future in self.prefetch_futures:
+            future.cancel()
+        self.prefetch_futures = []
+
+        # Tk variables must only be read on the main thread.
+        include_instrumental = self.include_instrumental_var.get()
+        page_size = self.page_size_var.get()
+
+        def worker() -> list[dict]:
+            raw = self.api.search_tracks(track_query=query, page=1)
+            track_list = raw.get("message", {}).get("body", {}).get("track_list", [])
+            results = []
+            for item in track_list:
+                track = item.get("track", {})
+                if not track:
+                    continue
+                if not include_instrumental and track.get("has_lyrics") != 1:
+                    continue
+                results.append(track)
+                if len(results) >= page_size:
+                    break
+            return results
+
+        future = self.executor.submit(worker)
+        future.add_done_callback(lambda f: self._post(self._finish_search, generation, f))
+
+    def _post(self, callback, *args) -> None:
+        """Schedule ``callback`` on the Tk thread from a worker thread."""
         try:
-            msg, payload = work_queue.get_nowait()
-        except queue.Empty:
-            self.after(100, self._poll_queue, work_queue)
-            return
+            self.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):  # pragma: no cover - window closed
+            pass
 
-        if msg == "done":
-            self._populate_results(payload.get("results", []))
-            self.status_var.set(f"Loaded {len(self.results)} track(s). Select one to view lyrics.")
-        else:
-            self.status_var.set(f"Error: {payload.get('message', 'Unknown error')}")
+    def _finish_search(self, generation: int, future: Future) -> None:
+        if generation != self.search_generation:
+            return
         self.search_button.configure(state=tk.NORMAL)
+        try:
+            results = future.result()
+        except Exception as err:  # pragma: no cover - UI flow
+            self.status_var.set(f"Error: {err}")
+            return
+
+        self._populate_results(results)
+        self.status_var.set(f"Loaded {len(self.results)} track(s). Select one to view lyrics.")
+        self._prefetch_lyrics(results[:PREFETCH_ROWS])
 
     def _populate_results(self, tracks: list[dict]) -> None:
         self.results = tracks
@@ -198,6 +227,47 @@ class CommercialCheckApp(tk.Tk):
 
     # ---- Lyrics inspection -------------------------------------------
 
+    def _fetch_lyrics(self, track_id: int) -> dict:
+        lyrics_payload = self.api.get_track_lyrics(track_id=track_id)
+        lyrics_body = (
+            lyrics_payload.get("message", {})
+            .get("body", {})
+            .get("lyrics", {})
+            .get("lyrics_body", "")
+        )
+        commercial_hold = COMMERCIAL_PLACEHOLDER in lyrics_body
+        text = "Lyrics not available (commercial hold)." if commercial_hold else (lyrics_body or "No lyrics provided.")
+        return {"text": text, "hold": commercial_hold}
+
+    def _request_lyrics(self, track_id: int, prefetch: bool = False) -> Future:
+        """Return the in-flight fetch for ``track_id``, starting one if needed.
+
+        A user request for a track whose prefetch is still queued cancels the
+        prefetch and fetches on the interactive pool instead.
+        """
+        future = self.lyrics_inflight.get(track_id)
+        if future is not None and not prefetch and future in self.prefetch_futures:
+            future.cancel()
+        if future is None or future.cancelled():
+            executor = self.prefetch_executor if prefetch else self.executor
+            future = executor.submit(self._fetch_lyrics, track_id)
+            self.lyrics_inflight[track_id] = future
+            future.add_done_callback(lambda f: self._post(self._store_lyrics, track_id, f))
+        return future
+
+    def _store_lyrics(self, track_id: int, future: Future) -> None:
+        if self.lyrics_inflight.get(track_id) is future:
+            del self.lyrics_inflight[track_id]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.lyrics_cache[track_id] = future.result()
+
+    def _prefetch_lyrics(self, tracks: list[dict]) -> None:
+        for track in tracks:
+            track_id = track.get("track_id")
+            if track_id and track_id not in self.lyrics_cache:
+                self.prefetch_futures.append(self._request_lyrics(track_id, prefetch=True))
+
     def on_select_track(self, event: object) -> None:
         selection = self.results_tree.selection()
         if not selection:
@@ -208,29 +278,33 @@ class CommercialCheckApp(tk.Tk):
         if not track_id:
             return
 
+        self.selection_generation += 1
+        generation = self.selection_generation
+
+        cached = self.lyrics_cache.get(track_id)
+        if cached is not None:
+            self._display_lyrics(track, cached["text"], cached["hold"])
+            return
+
         self.status_var.set("Fetching lyrics…")
         self.lyrics_text.configure(state=tk.NORMAL)
         self.lyrics_text.delete("1.0", tk.END)
         self.lyrics_text.insert("1.0", "Loading lyrics…")
         self.lyrics_text.configure(state=tk.DISABLED)
 
-        def worker() -> None:
-            try:
-                lyrics_payload = self.api.get_track_lyrics(track_id=track_id)
-                lyrics_body = (
-                    lyrics_payload.get("message", {})
-                    .get("body", {})
-                    .get("lyrics", {})
-                    .get("lyrics_body", "")
-                )
-                commercial_hold = COMMERCIAL_PLACEHOLDER in lyrics_body
-                text = "Lyrics not available (commercial hold)." if commercial_hold else (lyrics_body or "No lyrics provided.")
-                self.lyrics_cache[track_id] = {"text": text, "hold": commercial_hold}
-                self.after(0, self._display_lyrics, track, text, commercial_hold)
-            except Exception as err:  # pragma: no cover - UI flow
-                self.after(0, self._display_error, str(err))
-
-        threading.Thread(target=worker, daemon=True).start()
+        future = self._request_lyrics(track_id)
+        future.add_done_callback(lambda f: self._post(self._finish_lyrics, generation, track, f))
+
+    def _finish_lyrics(self, generation: int, track: dict, future: Future) -> None:
+        # A newer selection owns the lyrics pane now.
+        if generation != self.selection_generation or future.cancelled():
+            return
+        try:
+            lyrics = future.result()
+        except Exception as err:  # pragma: no cover - UI flow
+            self._display_error(str(err))
+            return
+        self._display_lyrics(track, lyrics["text"], lyrics["hold"])
 
     def _display_lyrics(self, track: dict, lyrics: str, hold: bool) -> None:
         self.status_var.set("Commercial hold" if hold else "Lyrics returned")
@@ -248,6 +322,11 @@ class CommercialCheckApp(tk.Tk):
         self.lyrics_text.insert("1.0", f"Error fetching lyrics: {message}")
         self.lyrics_text.configure(state=tk.DISABLED)
 
+    def on_close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
 
 def main() -> None:
     app = CommercialCheckApp()